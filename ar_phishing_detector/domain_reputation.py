@@ -0,0 +1,127 @@
+# ar_phishing_detector/domain_reputation.py
+import hashlib
+import math
+
+
+def normalize_domain(domain):
+    """
+    Normalise a hostname for lookups: lowercase, strip userinfo, port and trailing
+    dot, and convert internationalised labels to their punycode (xn--) form so
+    lookalike Unicode domains match ASCII blocklist entries.
+    """
+    domain = domain.strip().lower()
+    domain = domain.rsplit('@', 1)[-1]
+    if domain.startswith('['):
+        # IPv6 literal, nothing to normalise
+        return domain.split(']')[0] + ']'
+    domain = domain.split(':', 1)[0].rstrip('.')
+
+    labels = []
+    for label in domain.split('.'):
+        if label and not label.isascii():
+            try:
+                label = label.encode('idna').decode('ascii')
+            except UnicodeError:
+                pass
+        labels.append(label)
+    return '.'.join(labels)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing on one blake2b digest."""
+
+    def __init__(self, capacity, false_positive_rate=0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        # Standard sizing: m = -n ln p / (ln 2)^2, k = m/n ln 2
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class DomainReputation:
+    """
+    Blocklist of domains with exact and parent-domain matching.
+
+    Entries live in a hashed set; a lookup checks the domain and each of its
+    parent suffixes ("a.evil.com", "evil.com", "com"), so its cost depends on the
+    number of labels in the domain, not on the size of the list. Blocking
+    "evil.com" therefore also blocks every subdomain of it.
+
+    With use_bloom, a Bloom filter rejects most clean suffixes before the set is
+    consulted. The filter is pure Python and costs several times a set lookup,
+    so it only pays off when membership checks are expensive (e.g. a subclass
+    backed by a database or remote store); leave it off for in-memory lists.
+    """
+
+    def __init__(self, domains=(), use_bloom=False, false_positive_rate=0.001):
+        self.use_bloom = use_bloom
+        self.false_positive_rate = false_positive_rate
+        self._domains = set()
+        self._bloom = None
+        self.add_many(domains)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load one domain per line; blank lines and # comments are ignored."""
+        reputation = cls(**kwargs)
+        reputation.load_file(path)
+        return reputation
+
+    def load_file(self, path):
+        with open(path, encoding='utf-8') as f:
+            self.add_many(
+                line.split('#', 1)[0] for line in f if line.strip() and not line.lstrip().startswith('#')
+            )
+
+    def add_many(self, domains):
+        added = []
+        for domain in domains:
+            domain = normalize_domain(domain)
+            if domain and domain not in self._domains:
+                self._domains.add(domain)
+                added.append(domain)
+        if not self.use_bloom or not added:
+            return
+        if self._bloom is not None and len(self._domains) <= self._bloom.capacity:
+            for domain in added:
+                self._bloom.add(domain)
+        else:
+            # Out of capacity: rebuild with headroom so small later batches stay incremental
+            self._rebuild_bloom(2 * len(self._domains))
+
+    def _rebuild_bloom(self, capacity):
+        self._bloom = BloomFilter(capacity, self.false_positive_rate)
+        for domain in self._domains:
+            self._bloom.add(domain)
+
+    def __len__(self):
+        return len(self._domains)
+
+    def match(self, domain):
+        """Return the blocklist entry that domain or one of its parents matches, or None."""
+        domain = normalize_domain(domain)
+        labels = domain.split('.')
+        for i in range(len(labels)):
+            suffix = '.'.join(labels[i:])
+            if self._bloom is not None and suffix not in self._bloom:
+                continue
+            if suffix in self._domains:
+                return suffix
+        return None
+
+    def is_blocked(self, domain):
+        return self.match(domain) is not None
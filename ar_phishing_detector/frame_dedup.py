@@ -0,0 +1,47 @@
+# ar_phishing_detector/frame_dedup.py
+import cv2
+import numpy as np
+
+
+def dhash(frame, hash_size=8):
+    """
+    Difference hash of a BGR or grayscale frame, returned as an int of hash_size**2 bits.
+    Cheap enough to run on every sampled frame (one resize of a grayscale copy).
+    """
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class FrameDeduplicator:
+    """
+    Detect frames that are near-identical to the last frame that was analysed.
+
+    Static AR recordings and screen captures repeat the same picture for many
+    frames; those can reuse the previous frame's analysis instead of running
+    YOLO and OCR again.
+    """
+
+    def __init__(self, max_distance=4, hash_size=8):
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self._last_hash = None
+
+    def is_duplicate(self, frame):
+        """
+        Return True if frame is within max_distance bits of the last analysed frame.
+        Otherwise remember frame as the new reference and return False.
+        """
+        frame_hash = dhash(frame, self.hash_size)
+        if self._last_hash is not None and hamming_distance(frame_hash, self._last_hash) <= self.max_distance:
+            return True
+        self._last_hash = frame_hash
+        return False
+
+    def reset(self):
+        self._last_hash = None
@@ -1,78 +1,307 @@
 # ar_phishing_detector/ocr_analysis.py
-import easyocr
+import math
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
+import cv2
+import numpy as np
+from deepfake_detector_core.image_io import load_image
+from deepfake_detector_core.keyword_matcher import KeywordMatcher, load_keywords
+from deepfake_detector_core.metrics import in_current_context, span
+from .domain_reputation import DomainReputation
+
+URL_PATTERN = re.compile(r'https?://[\S]+')
+
+# 'full' runs EasyOCR's readtext on the whole image; 'roi' detects text on a
+# downscaled copy and recognises only the detected regions; 'tiled' reads large
+# images as overlapping tiles in parallel
+OCR_MODES = ('full', 'roi', 'tiled')
+
+
+def _scale_boxes(horizontal_list, free_list, factor):
+    """Scale EasyOCR detector boxes: [x_min, x_max, y_min, y_max] and 4-point polygons."""
+    horizontal = [[int(round(v * factor)) for v in box] for box in horizontal_list]
+    free = [[[int(round(x * factor)), int(round(y * factor))] for x, y in box] for box in free_list]
+    return horizontal, free
+
+
+def _tile_origins(length, tile_size, overlap):
+    """Start offsets of tiles of tile_size covering length, neighbours sharing at least overlap pixels."""
+    if length <= tile_size:
+        return [0]
+    origins = list(range(0, length - tile_size, tile_size - overlap))
+    origins.append(length - tile_size)
+    return origins
+
+
+def _box_rect(box):
+    xs = [x for x, _ in box]
+    ys = [y for _, y in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _rect_area(rect):
+    return max(0, rect[2] - rect[0]) * max(0, rect[3] - rect[1])
+
+
+def _merge_tile_lines(tile_lines, min_overlap=0.5):
+    """
+    Merge the text lines read from overlapping tiles into one list.
+
+    A line seen by two tiles appears twice, once possibly cut by a tile edge. Of
+    two lines from different tiles whose boxes share more than min_overlap of the
+    smaller box, only the larger is kept.
+    """
+    candidates = [
+        (_box_rect(line[0]), tile, line) for tile, lines in enumerate(tile_lines) for line in lines
+    ]
+    candidates.sort(key=lambda item: _rect_area(item[0]), reverse=True)
+
+    kept = []
+    for rect, tile, line in candidates:
+        area = _rect_area(rect)
+        duplicate = False
+        for kept_rect, kept_tile, _ in kept:
+            if kept_tile == tile:
+                continue
+            inter = _rect_area((max(rect[0], kept_rect[0]), max(rect[1], kept_rect[1]),
+                                min(rect[2], kept_rect[2]), min(rect[3], kept_rect[3])))
+            # Candidates come largest first, so this line is the smaller of the two
+            if area and inter / area > min_overlap:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append((rect, tile, line))
+    return [line for _, _, line in kept]
+
+
+def _group_paragraphs(lines):
+    """Group (bbox, text, confidence) lines into [bbox, text] paragraphs like readtext(paragraph=True)."""
+    try:
+        from easyocr.utils import get_paragraph
+    except ImportError:
+        return [[box, text] for box, text, _ in lines]
+    # Reading order first, as readtext produces it
+    lines = sorted(lines, key=lambda line: (line[0][0][1], line[0][0][0]))
+    return get_paragraph(lines, mode='ltr')
 
 
 class OCRAnalyzer:
-    def __init__(self):
+    def __init__(self, keyword_file=None, blocklist_file=None, use_bloom=False, mode='full',
+                 detect_max_side=1280, roi_text_height=64, roi_batch_size=16,
+                 tile_size=1280, tile_overlap=160, tile_workers=None):
+        """
+        keyword_file optionally adds one lure keyword or phrase per line to the built-in list.
+        blocklist_file optionally loads a domain blocklist (one domain per line) matched
+        against URL domains and their parent domains.
+        mode='roi' runs text detection on a copy downscaled to detect_max_side pixels
+        and recognition only on the detected regions, in batches of roi_batch_size,
+        from a copy scaled so the smallest text row is about roi_text_height pixels.
+        mode='tiled' reads images larger than tile_size as tile_size squares that
+        overlap by tile_overlap pixels, on tile_workers threads (default: up to 4).
+        """
+        import easyocr
+
+        if mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode '{mode}', expected one of {OCR_MODES}")
+        self.mode = mode
+        self.detect_max_side = detect_max_side
+        self.roi_text_height = roi_text_height
+        self.roi_batch_size = roi_batch_size
+        if tile_overlap >= tile_size:
+            raise ValueError("tile_overlap must be smaller than tile_size")
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tile_workers = tile_workers or min(4, os.cpu_count() or 1)
+
         self.reader = easyocr.Reader(['en'], gpu=False)  # GPU off for broader compatibility
         self.suspicious_keywords = [
             'login', 'verify', 'update', 'account', 'password', 'bank',
             'urgent', 'security', 'authentication', 'credentials',
             'payment', 'confirm', 'access', 'secure'
         ]
+        if keyword_file:
+            self.suspicious_keywords += load_keywords(keyword_file)
+        # Compiled once; finds every keyword and its context boost in one pass over the text
+        self.keyword_matcher = KeywordMatcher(
+            self.suspicious_keywords,
+            prefixes=['immediate', 'urgent', 'secure'],
+            suffixes=['now', 'required']
+        )
         self.suspicious_domains = [
             'bit.ly', 'tinyurl', 'phish', 'fake', 'login', 'secure',
             'verify', 'account', 'bank', 'update'
         ]
+        self._suspicious_domain_re = re.compile('|'.join(re.escape(d) for d in self.suspicious_domains))
+        self.domain_reputation = DomainReputation.from_file(blocklist_file, use_bloom=use_bloom) \
+            if blocklist_file else None
 
     def extract_text(self, image_path):
-        """Extract text from image with enhanced OCR settings."""
+        """
+        Extract text from image with enhanced OCR settings.
+
+        image_path may also be encoded bytes or a decoded BGR array; EasyOCR derives
+        its grayscale recognition input from the array without touching the file.
+        Every mode returns paragraph-grouped (bbox, text) results in the
+        coordinates of the original image.
+        """
         try:
-            results = self.reader.readtext(image_path, detail=1, paragraph=True)
+            with span('ocr.extract'):
+                if self.mode == 'roi':
+                    results = self._readtext_roi(image_path)
+                elif self.mode == 'tiled':
+                    results = self._readtext_tiled(image_path)
+                else:
+                    results = self.reader.readtext(image_path, detail=1, paragraph=True)
             text_data = " ".join([res[1] for res in results])
             return text_data, results
         except Exception as e:
             print(f"Error in OCR extraction: {str(e)}")
             return "", []
 
+    def _readtext_roi(self, image):
+        """
+        Region-of-interest OCR: detect on a downscaled image, recognise only the
+        detected regions, and skip recognition when no text is found.
+        """
+        img = load_image(image)
+        height, width = img.shape[:2]
+
+        # Detection only needs the layout, not full resolution
+        detect_scale = min(1.0, self.detect_max_side / max(height, width))
+        small = img if detect_scale == 1.0 else cv2.resize(
+            img, (max(1, round(width * detect_scale)), max(1, round(height * detect_scale))),
+            interpolation=cv2.INTER_AREA
+        )
+        with span('ocr.detect'):
+            horizontal_list, free_list = self.reader.detect(small, canvas_size=self.detect_max_side)
+        horizontal_list, free_list = horizontal_list[0], free_list[0]
+        if not horizontal_list and not free_list:
+            return []
+
+        # Recognition resolution: shrink until the smallest text row is about
+        # roi_text_height pixels (the recogniser's input height), never upscale
+        row_heights = [box[3] - box[2] for box in horizontal_list] + \
+                      [max(y for _, y in box) - min(y for _, y in box) for box in free_list]
+        smallest_row = max(min(row_heights), 1) / detect_scale
+        recognize_scale = min(1.0, self.roi_text_height / smallest_row)
+
+        grey = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if recognize_scale < 1.0:
+            grey = cv2.resize(grey, (max(1, round(width * recognize_scale)), max(1, round(height * recognize_scale))),
+                              interpolation=cv2.INTER_AREA)
+        horizontal_list, free_list = _scale_boxes(horizontal_list, free_list, recognize_scale / detect_scale)
+
+        with span('ocr.recognize'):
+            results = self._recognize_regions(grey, horizontal_list, free_list)
+
+        # Report boxes in the coordinates of the original image
+        return [
+            [[[int(round(x / recognize_scale)), int(round(y / recognize_scale))] for x, y in box], text]
+            for box, text in results
+        ]
+
+    def _recognize_regions(self, grey, horizontal_list, free_list):
+        """
+        Recognise text regions of a greyscale image as batches and group the lines
+        into paragraphs, like readtext(paragraph=True).
+
+        EasyOCR's recognize() runs one region at a time on CPU. Here the crops are
+        sorted by width and run roi_batch_size at a time, so each batch pads to
+        a similar width. Falls back to recognize() if EasyOCR's internals differ.
+        """
+        try:
+            from easyocr import easyocr as easyocr_module
+            from easyocr.recognition import get_text
+            from easyocr.utils import get_image_list
+        except ImportError:
+            return self.reader.recognize(grey, horizontal_list, free_list, detail=1, paragraph=True)
+
+        reader = self.reader
+        model_height = getattr(easyocr_module, 'imgH', 64)
+        crops, _ = get_image_list(horizontal_list, free_list, grey, model_height=model_height)
+        crops.sort(key=lambda item: item[1].shape[1])
+        ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+
+        lines = []
+        for start in range(0, len(crops), self.roi_batch_size):
+            batch = crops[start:start + self.roi_batch_size]
+            # Pad to the widest crop of the batch, in whole multiples of the model height
+            max_width = math.ceil(max(crop.shape[1] for _, crop in batch) / model_height) * model_height
+            lines += get_text(reader.character, model_height, max_width, reader.recognizer, reader.converter,
+                              batch, ignore_char, batch_size=len(batch), workers=0, device=reader.device)
+
+        return _group_paragraphs(lines)
+
+    def _readtext_tiled(self, image):
+        """
+        Tiled OCR for very large captures and long scrolling screenshots.
+
+        Each tile is read on its own thread (EasyOCR's torch models release the
+        GIL), so peak memory depends on tile_size and tile_workers rather than on
+        the image size, and the detector sees every tile at full resolution
+        instead of the whole image squeezed into its canvas. Lines are shifted
+        back to image coordinates, duplicates from the overlaps are merged, and
+        the result is grouped into paragraphs.
+        """
+        img = load_image(image)
+        height, width = img.shape[:2]
+        if max(height, width) <= self.tile_size:
+            return self.reader.readtext(img, detail=1, paragraph=True)
+
+        origins = [
+            (x, y)
+            for y in _tile_origins(height, self.tile_size, self.tile_overlap)
+            for x in _tile_origins(width, self.tile_size, self.tile_overlap)
+        ]
+
+        def read_tile(x, y):
+            tile = np.ascontiguousarray(img[y:y + self.tile_size, x:x + self.tile_size])
+            with span('ocr.tile'):
+                lines = self.reader.readtext(tile, detail=1, paragraph=False)
+            return [
+                ([[int(px) + x, int(py) + y] for px, py in box], text, confidence)
+                for box, text, confidence in lines
+            ]
+
+        with ThreadPoolExecutor(self.tile_workers, thread_name_prefix="ocr-tile") as pool:
+            futures = [pool.submit(in_current_context(read_tile), x, y) for x, y in origins]
+            tile_lines = [future.result() for future in futures]
+
+        return _group_paragraphs(_merge_tile_lines(tile_lines))
+
     def detect_suspicious_keywords(self, text):
         """Detect suspicious keywords with context analysis."""
         if not text:
             return []
 
-        text_lower = text.lower()
-        matches = []
-
-        for keyword in self.suspicious_keywords:
-            # Look for keyword in context
-            if keyword in text_lower:
-                # Check for phrases that increase suspicion
-                context_phrases = [
-                    f"{keyword} now", f"immediate {keyword}", f"{keyword} required",
-                    f"urgent {keyword}", f"secure {keyword}"
-                ]
-                if any(phrase in text_lower for phrase in context_phrases):
-                    matches.append((keyword, 0.9))  # Higher confidence for contextual matches
-                else:
-                    matches.append((keyword, 0.6))
-
-        return matches
+        return self.keyword_matcher.find(text)
 
     def detect_suspicious_urls(self, text):
         """Detect suspicious URLs with domain analysis."""
         if not text:
             return []
 
-        urls = re.findall(r'https?://[\S]+', text)
         phishing_urls = []
 
-        for url in urls:
+        for url in URL_PATTERN.findall(text):
             try:
                 parsed = urlparse(url)
                 domain = parsed.netloc.lower()
-                # Check for suspicious domains and URL patterns
-                if any(susp_domain in domain for susp_domain in self.suspicious_domains) or \
+                blocklist_match = self.domain_reputation.match(domain) if self.domain_reputation else None
+                keyword_match = self._suspicious_domain_re.search(domain) is not None
+                # Check blocklist, suspicious domain fragments and URL patterns
+                if blocklist_match or keyword_match or \
                         len(domain) > 50 or \
                         sum(c.isdigit() for c in domain) > 5:  # Suspiciously long or number-heavy domains
                     phishing_urls.append({
                         'url': url,
                         'domain': domain,
-                        'confidence': 0.8 if any(
-                            susp_domain in domain for susp_domain in self.suspicious_domains) else 0.6
+                        'blocklist_match': blocklist_match,
+                        'confidence': 0.95 if blocklist_match else 0.8 if keyword_match else 0.6
                     })
             except:
                 continue
 
-        return phishing_urls
\ No newline at end of file
+        return phishing_urls
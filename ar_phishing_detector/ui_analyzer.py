@@ -2,121 +2,167 @@
 
 import cv2
 import os
-import shutil
-from .yolo_ui_detector import YOLODetector
-from .ocr_analysis import OCRAnalyzer
+from deepfake_detector_core.image_io import load_image, describe_source
+from deepfake_detector_core.metrics import span, timed
+from deepfake_detector_core.model_registry import get_model
+from .frame_dedup import FrameDeduplicator
 
 
-def extract_frames(video_path, frame_rate=15, max_frames=100):
+def iter_frames(video_path, frame_rate=15, max_frames=100):
     """
-    Extract frames from video at specified rate with error handling and cleanup.
+    Lazily yield (frame_index, frame) pairs for every frame_rate-th frame of a video.
+
+    Frames are decoded BGR arrays kept in memory; skipped frames are only grabbed,
+    never converted, and nothing is written to disk.
     """
-    try:
-        if not os.path.exists(video_path):
-            raise FileNotFoundError(f"Video file not found: {video_path}")
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video file not found: {video_path}")
 
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Failed to open video: {video_path}")
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Failed to open video: {video_path}")
 
-        frames = []
+    try:
         index = 0
-        temp_dir = "temp_frames"
-        os.makedirs(temp_dir, exist_ok=True)
-
-        while cap.isOpened() and len(frames) < max_frames:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        yielded = 0
+        while yielded < max_frames:
             if index % frame_rate == 0:
-                frame_path = os.path.join(temp_dir, f"frame_{index}.jpg")
-                cv2.imwrite(frame_path, frame)
-                frames.append(frame_path)
+                with span('video.decode'):
+                    ret, frame = cap.read()
+                if not ret:
+                    break
+                yield index, frame
+                yielded += 1
+            else:
+                with span('video.decode'):
+                    grabbed = cap.grab()
+                if not grabbed:
+                    break
             index += 1
-
+    finally:
         cap.release()
-        return frames
 
+
+def extract_frames(video_path, frame_rate=15, max_frames=100):
+    """
+    Extract frames from video at specified rate with error handling.
+    Returns a list of in-memory BGR frames.
+    """
+    try:
+        return [frame for _, frame in iter_frames(video_path, frame_rate, max_frames)]
     except Exception as e:
         print(f"Error in frame extraction: {str(e)}")
         return []
 
-    finally:
-        if os.path.exists(temp_dir) and not frames:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+
+def score_ui_anomalies(ui_elements, text, ocr_results, ocr):
+    """
+    Combine YOLO detections and OCR text into a UI phishing result.
+    """
+    # Detect suspicious patterns
+    with span('ui.text_scan'):
+        suspicious_keywords = ocr.detect_suspicious_keywords(text)
+        suspicious_urls = ocr.detect_suspicious_urls(text)
+
+    # Compute phishing confidence
+    confidence = 0.0
+    if ui_elements:
+        confidence += sum(item['confidence'] for item in ui_elements) * 0.4
+    if suspicious_keywords:
+        confidence += len(suspicious_keywords) * 0.3
+    if suspicious_urls:
+        confidence += len(suspicious_urls) * 0.2
+
+    return {
+        'ui_elements': ui_elements,
+        'suspicious_keywords': suspicious_keywords,
+        'suspicious_urls': suspicious_urls,
+        'ocr_results': ocr_results,
+        'confidence': min(confidence, 1.0),
+        'is_phishing': confidence > 0.7
+    }
 
 
 def analyze_ui_anomalies(image_path):
     """
     Analyze a single image for UI-based phishing anomalies using YOLO and OCR.
+
+    Accepts a file path, encoded bytes or an already decoded BGR array; the image
+    is decoded once and the same buffer is handed to both detectors.
     """
     try:
-        # Initialize detectors
-        yolo = YOLODetector()
-        ocr = OCRAnalyzer()
+        # Shared detectors, loaded once per process
+        yolo = get_model('yolo')
+        ocr = get_model('ocr')
+
+        with span('image.decode'):
+            img = load_image(image_path)
 
         # Detect UI elements (YOLO)
-        ui_elements = yolo.detect_ui_elements(image_path)
+        ui_elements = yolo.detect_ui_elements(img)
 
         # Extract text and OCR results
-        text, ocr_results = ocr.extract_text(image_path)
-
-        # Detect suspicious patterns
-        suspicious_keywords = ocr.detect_suspicious_keywords(text)
-        suspicious_urls = ocr.detect_suspicious_urls(text)
-
-        # Compute phishing confidence
-        confidence = 0.0
-        if ui_elements:
-            confidence += sum(item['confidence'] for item in ui_elements) * 0.4
-        if suspicious_keywords:
-            confidence += len(suspicious_keywords) * 0.3
-        if suspicious_urls:
-            confidence += len(suspicious_urls) * 0.2
+        text, ocr_results = ocr.extract_text(img)
 
-        return {
-            'ui_elements': ui_elements,
-            'suspicious_keywords': suspicious_keywords,
-            'suspicious_urls': suspicious_urls,
-            'ocr_results': ocr_results,
-            'confidence': min(confidence, 1.0),
-            'is_phishing': confidence > 0.7
-        }
+        return score_ui_anomalies(ui_elements, text, ocr_results, ocr)
 
     except Exception as e:
-        print(f"Error analyzing image {image_path}: {str(e)}")
+        print(f"Error analyzing image {describe_source(image_path)}: {str(e)}")
         return {'error': str(e), 'confidence': 0.0, 'is_phishing': False}
 
 
-def analyze_video_ui(video_path):
+def iter_frame_results(video_path, frame_rate=15, max_frames=100, dedup=True, max_hash_distance=4):
+    """
+    Lazily yield (frame_index, frame, ui_result, reused) for each sampled video frame.
+
+    With dedup enabled, a frame whose perceptual hash is within max_hash_distance
+    bits of the last analysed frame reuses that frame's result (reused=True)
+    instead of running YOLO and OCR again.
+    """
+    deduplicator = FrameDeduplicator(max_distance=max_hash_distance) if dedup else None
+    last_result = None
+
+    for index, frame in iter_frames(video_path, frame_rate, max_frames):
+        if deduplicator is not None:
+            with span('video.dedup'):
+                duplicate = deduplicator.is_duplicate(frame)
+            if duplicate:
+                yield index, frame, last_result, True
+                continue
+        last_result = analyze_ui_anomalies(frame)
+        yield index, frame, last_result, False
+
+
+@timed('analyze_video_ui')
+def analyze_video_ui(video_path, dedup=True):
     """
     Analyze video for phishing using multiple frame-based UI/OCR scans.
     """
     try:
-        frames = extract_frames(video_path)
-        if not frames:
-            return {'error': 'No frames extracted', 'results': []}
-
         results = []
         total_confidence = 0.0
         phishing_frames = 0
+        reused_frames = 0
 
-        for path in frames:
-            result = analyze_ui_anomalies(path)
-            results.append((path, result))
+        for index, _, result, reused in iter_frame_results(video_path, dedup=dedup):
+            results.append((index, result))
+            reused_frames += reused
             total_confidence += result['confidence']
             if result['is_phishing']:
                 phishing_frames += 1
 
-        shutil.rmtree("temp_frames", ignore_errors=True)
+        if not results:
+            return {'error': 'No frames extracted', 'results': []}
 
-        avg_confidence = total_confidence / len(frames) if frames else 0.0
-        is_phishing = avg_confidence > 0.7 or phishing_frames / len(frames) > 0.3
+        avg_confidence = total_confidence / len(results)
+        is_phishing = avg_confidence > 0.7 or phishing_frames / len(results) > 0.3
 
         return {
             'frame_results': results,
             'average_confidence': avg_confidence,
-            'phishing_frames_ratio': phishing_frames / len(frames) if frames else 0.0,
+            'phishing_frames_ratio': phishing_frames / len(results),
+            'frames_analyzed': len(results) - reused_frames,
+            'frames_reused': reused_frames,
             'is_phishing': is_phishing
         }
 
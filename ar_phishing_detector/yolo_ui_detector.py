@@ -1,61 +1,137 @@
-from ultralytics import YOLO
 import cv2
+import os
+import shutil
+import tempfile
+import threading
 import numpy as np
+from deepfake_detector_core.backends import check_backend, onnx_cache_path
+from deepfake_detector_core.image_io import load_image
+from deepfake_detector_core.metrics import span
 
 
 class YOLODetector:
-    def __init__(self, model_path="yolov8n.pt"):
+    def __init__(self, model_path="yolov8n.pt", backend='torch'):
         """
         Initialize YOLOv8 model for UI anomaly detection.
+        backend='onnx' runs a cached ONNX export through ONNX Runtime, falling back to torch.
         """
-        self.model = YOLO(model_path)
+        from ultralytics import YOLO
+
+        self.backend = check_backend(backend)
+        # The registry shares one detector across threads, and Ultralytics predictors
+        # are not thread-safe, so model calls are serialised
+        self._lock = threading.Lock()
+        self.model = None
+        if self.backend == 'onnx':
+            self.model = self._load_onnx(model_path)
+        if self.model is None:
+            self.backend = 'torch'
+            self.model = YOLO(model_path)
         self.suspicious_classes = [
             'keyboard', 'screen', 'cell phone', 'button', 'input_field',
             'login_form', 'password_field', 'qr_code', 'popup'
         ]
 
+    @staticmethod
+    def _load_onnx(model_path):
+        """Load the cached ONNX export of a YOLO model, exporting it on first use."""
+        from ultralytics import YOLO
+
+        try:
+            name = os.path.splitext(os.path.basename(model_path))[0]
+            path = onnx_cache_path(f"yolo_{name}")
+            if not os.path.exists(path):
+                YOLODetector._export_onnx(model_path, path)
+            return YOLO(path, task='detect')
+        except Exception as e:
+            print(f"Error loading ONNX YOLO model, falling back to torch: {str(e)}")
+            return None
+
+    @staticmethod
+    def _export_onnx(model_path, path):
+        """
+        Export to ONNX and move the graph into place atomically. Ultralytics writes
+        the export next to the checkpoint, so the checkpoint is first copied into a
+        private directory beside the cache: concurrent exports (one per worker
+        process) never share a file, and a half-written graph is never cached.
+        """
+        from ultralytics import YOLO
+
+        # Resolves (and downloads, if needed) the checkpoint
+        checkpoint = getattr(YOLO(model_path), 'ckpt_path', None) or model_path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix="yolo_export_", dir=os.path.dirname(path))
+        try:
+            local = shutil.copy(checkpoint, work_dir)
+            exported = YOLO(local).export(format='onnx', dynamic=True)
+            os.replace(exported, path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
     def preprocess_image(self, image_path):
         """
-        Preprocess image: load, enhance contrast/brightness.
+        Preprocess image: load (path, encoded bytes or BGR array), enhance contrast/brightness.
+        Decoded arrays are used as-is, so callers that already hold the frame pay no decode.
         """
-        img = cv2.imread(image_path)
-        if img is None:
-            raise ValueError(f"Failed to load image: {image_path}")
+        img = load_image(image_path)
 
         # Enhance contrast and brightness
         img = cv2.convertScaleAbs(img, alpha=1.2, beta=10)
         return img
 
+    def _suspicious_items(self, result):
+        """
+        Filter one YOLO result down to the top 5 suspicious UI elements.
+        """
+        suspicious_items = []
+
+        for box in result.boxes:
+            cls_id = int(box.cls)
+            cls_name = result.names[cls_id]
+
+            if cls_name in self.suspicious_classes:
+                conf = float(box.conf)
+                if conf > 0.5:
+                    x1, y1, x2, y2 = box.xyxy[0].tolist()
+                    area = (x2 - x1) * (y2 - y1)
+                    suspicious_items.append({
+                        'label': cls_name,
+                        'confidence': conf,
+                        'bbox': [x1, y1, x2, y2],
+                        'area': float(area)
+                    })
+
+        # Sort and return top 5 by confidence
+        suspicious_items.sort(key=lambda x: x['confidence'], reverse=True)
+        return suspicious_items[:5]
+
     def detect_ui_elements(self, image_path):
         """
         Detect suspicious UI elements from image using YOLO.
         """
         try:
-            img = self.preprocess_image(image_path)
-            results = self.model(img)
-            detections = results[0].boxes
-            suspicious_items = []
-
-            for box in detections:
-                cls_id = int(box.cls)
-                cls_name = results[0].names[cls_id]
-
-                if cls_name in self.suspicious_classes:
-                    conf = float(box.conf)
-                    if conf > 0.5:
-                        x1, y1, x2, y2 = box.xyxy[0].tolist()
-                        area = (x2 - x1) * (y2 - y1)
-                        suspicious_items.append({
-                            'label': cls_name,
-                            'confidence': conf,
-                            'bbox': [x1, y1, x2, y2],
-                            'area': float(area)
-                        })
-
-            # Sort and return top 5 by confidence
-            suspicious_items.sort(key=lambda x: x['confidence'], reverse=True)
-            return suspicious_items[:5]
+            with span('yolo.detect'):
+                img = self.preprocess_image(image_path)
+                with self._lock:
+                    results = self.model(img)
+                return self._suspicious_items(results[0])
 
         except Exception as e:
             print(f"Error in YOLO detection: {str(e)}")
             return []
+
+    def detect_ui_elements_batch(self, images):
+        """
+        Detect suspicious UI elements in several images with one YOLO call.
+        Returns one list of detections per image, in input order.
+        """
+        try:
+            with span('yolo.detect_batch'):
+                imgs = [self.preprocess_image(image) for image in images]
+                with self._lock:
+                    results = self.model(imgs)
+                return [self._suspicious_items(result) for result in results]
+
+        except Exception as e:
+            print(f"Error in batched YOLO detection: {str(e)}")
+            return [[] for _ in images]
@@ -0,0 +1,243 @@
+# benchmarks/run_benchmarks.py
+"""
+Performance benchmarks over the bundled data/ corpus.
+
+Each stage runs in a fresh process and reports model cold-start time, warm
+p50/p95/p99 latency, throughput and the peak RSS of that process, written as
+JSON. Pass --baseline to compare against a saved run;
+the script exits with status 1 if any stage's p50 or p95 regressed by more than
+--threshold.
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --threshold 0.15
+"""
+import argparse
+import glob
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from deepfake_detector_core.model_registry import get_model, registry  # noqa: E402
+
+STAGES = [
+    'xception_classify', 'yolo_detect', 'ocr_extract', 'text_scan',
+    'whisper_transcribe', 'nlp_score', 'e2e_image', 'e2e_video', 'e2e_audio'
+]
+
+
+def peak_rss_mb():
+    # High-water mark of the whole process, hence one process per stage.
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def corpus(data_dir):
+    def files(folder, *exts):
+        return sorted(p for ext in exts for p in glob.glob(os.path.join(data_dir, folder, ext)))
+
+    return {
+        'images': files('sample_images', '*.png', '*.jpg', '*.jpeg') + files('ar_screenshots', '*.png', '*.jpg', '*.jpeg'),
+        'videos': files('sample_videos', '*.mp4'),
+        'audio': files('voice_clips', '*.mp3', '*.wav')
+    }
+
+
+class Bench:
+    def __init__(self, repeat, warmup):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.cold_start = {}
+
+    def model(self, name):
+        """Fetch a model from the registry, recording its load time on first use."""
+        if name not in self.cold_start:
+            start = time.perf_counter()
+            get_model(name)
+            self.cold_start[name] = time.perf_counter() - start
+        return get_model(name)
+
+    def measure(self, fn, inputs, models):
+        """Time fn over every input, repeat times, after warmup passes over every input."""
+        for name in models:
+            self.model(name)
+        if not inputs:
+            return None
+        # Every input, so one-off costs of each input size are paid before timing
+        for _ in range(self.warmup):
+            for item in inputs:
+                fn(item)
+
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            for item in inputs:
+                t0 = time.perf_counter()
+                fn(item)
+                latencies.append(time.perf_counter() - t0)
+        wall = time.perf_counter() - start
+
+        return {
+            'cold_start_s': round(sum(self.cold_start.get(name, 0.0) for name in models), 4),
+            'samples': len(latencies),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+            'throughput_per_s': round(len(latencies) / wall, 3) if wall else 0.0,
+            'peak_rss_mb': round(peak_rss_mb(), 1)
+        }
+
+
+def measure_stage(stage, data, bench):
+    from deepfake_detector_core.image_io import load_image
+
+    def images():
+        return [load_image(path) for path in data['images']]
+
+    def texts_from_ocr():
+        ocr = bench.model('ocr')
+        return [ocr.extract_text(img)[0] for img in images()]
+
+    def transcripts():
+        transcriber = bench.model('transcriber')
+        return [transcriber.transcribe_audio(clip)['text'] for clip in data['audio']]
+
+    if stage == 'xception_classify':
+        classifier = bench.model('deepfake')
+        return bench.measure(
+            lambda img: classifier._dl_scores(classifier.preprocess_image(img)), images(), ['deepfake'])
+    if stage == 'yolo_detect':
+        return bench.measure(lambda img: bench.model('yolo').detect_ui_elements(img), images(), ['yolo'])
+    if stage == 'ocr_extract':
+        return bench.measure(lambda img: bench.model('ocr').extract_text(img), images(), ['ocr'])
+    if stage == 'text_scan':
+        ocr = bench.model('ocr')
+        return bench.measure(
+            lambda text: (ocr.detect_suspicious_keywords(text), ocr.detect_suspicious_urls(text)),
+            texts_from_ocr(), ['ocr'])
+    if stage == 'whisper_transcribe':
+        return bench.measure(
+            lambda clip: bench.model('transcriber').transcribe_audio(clip), data['audio'], ['transcriber'])
+    if stage == 'nlp_score':
+        return bench.measure(
+            lambda text: bench.model('nlp').detect_phishing_nlp(text), [t for t in transcripts() if t], ['nlp'])
+    if stage == 'e2e_image':
+        return bench.measure(
+            lambda path: bench.model('deepfake').classify_image(path), data['images'], ['deepfake', 'yolo', 'ocr'])
+    if stage == 'e2e_video':
+        return bench.measure(
+            lambda path: bench.model('deepfake').classify_video(path), data['videos'], ['deepfake', 'yolo', 'ocr'])
+    if stage == 'e2e_audio':
+        def audio_pipeline(clip):
+            text = bench.model('transcriber').transcribe_audio(clip)['text']
+            return bench.model('nlp').detect_phishing_nlp(text)
+        return bench.measure(audio_pipeline, data['audio'], ['transcriber', 'nlp'])
+    raise ValueError(f"Unknown stage '{stage}'")
+
+
+def run_stage(stage, data, repeat, warmup, ocr_mode):
+    """
+    Entry point of the per-stage process: returns (stats, cold start seconds by
+    model, loaded model names).
+    """
+    registry.register('ocr', mode=ocr_mode)
+    bench = Bench(repeat, warmup)
+    stats = measure_stage(stage, data, bench)
+    return stats, bench.cold_start, [name for name, _ in registry.loaded()]
+
+
+def compare(current, baseline, threshold):
+    """Return a list of human-readable regressions beyond threshold (e.g. 0.1 = 10%)."""
+    regressions = []
+    for stage, stats in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not stats or not base:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if base[metric] and stats[metric] > base[metric] * (1 + threshold):
+                change = stats[metric] / base[metric] - 1
+                regressions.append(f"{stage} {metric}: {base[metric]} -> {stats[metric]} (+{change:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark AURA-GUARD pipelines on the bundled data")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, 'data'))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over each input")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed passes over every input before timing")
+    parser.add_argument("--ocr-mode", default="full", choices=["full", "roi", "tiled"])
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before failing")
+    args = parser.parse_args(argv)
+
+    import torch
+
+    data = corpus(args.data_dir)
+    stages, cold_start, loaded = {}, {}, set()
+    for stage in args.stages:
+        print(f"Running {stage}...", file=sys.stderr)
+        # A fresh process per stage: peak RSS and cold start are then the stage's own
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            stats, stage_cold_start, stage_loaded = executor.submit(
+                run_stage, stage, data, args.repeat, args.warmup, args.ocr_mode).result()
+        stages[stage] = stats
+        for name, seconds in stage_cold_start.items():
+            cold_start.setdefault(name, seconds)
+        loaded.update(stage_loaded)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'torch_threads': torch.get_num_threads(),
+            'cpu': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'cuda': torch.cuda.is_available(),
+            'repeat': args.repeat,
+            'ocr_mode': args.ocr_mode
+        },
+        'stages': stages,
+        'cold_start_s': {name: round(t, 4) for name, t in cold_start.items()},
+        'loaded_models': sorted(loaded)
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report['stages'], indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions beyond threshold:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print("No regressions beyond threshold", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
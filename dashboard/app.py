@@ -1,15 +1,15 @@
+import time
+
+# Measured from here so the sidebar can report how long the page took to render
+SCRIPT_START = time.perf_counter()
+
 import sys
 import os
+import json
+import tempfile
 import streamlit as st
-import shutil
-import requests
 import plotly.graph_objects as go
 from streamlit_lottie import st_lottie
-from PIL import Image
-import time
-import uuid
-import subprocess
-import torch
 
 # Adjust path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -17,19 +17,28 @@ root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(root_path)
 
 # Imports from modules
-from deepfake_detector_core.inference import PhishingClassifier
-from ar_phishing_detector.ocr_analysis import OCRAnalyzer
-from ar_phishing_detector.yolo_ui_detector import YOLODetector
-from voice_phishing_detector.transcriber import AudioTranscriber
-from voice_phishing_detector.phishing_nlp import PhishingNLPDetector
+from deepfake_detector_core.model_registry import get_model, registry
+from deepfake_detector_core.result_cache import content_digest
+from voice_phishing_detector.audio_io import check_ffmpeg, decode_audio
+
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# Analysis results kept per session; the oldest are dropped beyond this
+MAX_SESSION_RESULTS = 16
+
 
+# Load a Lottie animation bundled with the app, once per process
+@st.cache_data
+def load_lottie_file(name: str):
+    with open(os.path.join(ASSETS_DIR, name), encoding='utf-8') as f:
+        return json.load(f)
 
-# Load Lottie JSON from URL
-def load_lottie_url(url: str):
-    r = requests.get(url)
-    if r.status_code != 200:
-        return None
-    return r.json()
+
+# The ffmpeg binary does not change while the app runs, so probe it once per process
+@st.cache_resource
+def ffmpeg_available():
+    return check_ffmpeg()
 
 
 # Enhanced Plotly gauge chart
@@ -65,15 +74,6 @@ def draw_gauge(title, value, color):
     return fig
 
 
-# Check FFmpeg availability
-def check_ffmpeg():
-    try:
-        subprocess.run(["ffmpeg", "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return True
-    except FileNotFoundError:
-        return False
-
-
 # Streamlit configuration
 st.set_page_config(
     page_title="AURA-GUARD",
@@ -85,7 +85,6 @@ st.set_page_config(
 # CSS Styling
 st.markdown("""
 <style>
-    @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;700&display=swap');
     .main {
         background: linear-gradient(135deg, #0d1b2a 0%, #1b263b 100%);
         color: #e0e1dd;
@@ -162,7 +161,7 @@ st.markdown("""
 
 # Sidebar
 with st.sidebar:
-    st.image("https://via.placeholder.com/150?text=AURA-GUARD", caption="AURA-GUARD Logo")
+    st.image(os.path.join(ASSETS_DIR, "logo.png"), caption="AURA-GUARD Logo")
     st.markdown("<h2 style='text-align: center;'>🛡️ AURA-GUARD</h2>", unsafe_allow_html=True)
     st.markdown("<p style='text-align: center; color: #e0e1dd;'>AI-powered cybersecurity platform</p>",
                 unsafe_allow_html=True)
@@ -185,29 +184,47 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Initialize models
+# Models are loaded on first use by each tab through the shared model registry.
+# Warm-up optionally preloads all of them in a background thread, once per process.
 @st.cache_resource
-def initialize_models():
-    return {
-        'deepfake': PhishingClassifier(),
-        'ocr': OCRAnalyzer(),
-        'yolo': YOLODetector(),
-        'transcriber': AudioTranscriber(),
-        'nlp': PhishingNLPDetector()
-    }
+def start_model_warm_up():
+    return registry.warm_up()
 
 
-models = initialize_models()
-lottie_spinner = load_lottie_url("https://assets6.lottiefiles.com/packages/lf20_kkflmtur.json")
-
-# Check GPU availability
-if not torch.cuda.is_available():
-    st.markdown("""
-    <div class='card error'>
-        <h3>Warning</h3>
-        <p>Running on CPU. For better performance, consider using a GPU with CUDA support.</p>
-    </div>
-    """, unsafe_allow_html=True)
+with st.sidebar:
+    if st.checkbox("Preload models in background", value=os.environ.get('AURA_GUARD_WARMUP') == '1'):
+        start_model_warm_up()
+    # Filled at the end of the script, once this run's models have loaded
+    model_status = st.empty()
+
+lottie_spinner = load_lottie_file("spinner.json")
+
+
+def analyze_once(kind, data, message, compute):
+    """
+    Return compute()'s result for an upload, running it at most once per session.
+
+    Results are keyed by the upload's content hash, so the reruns Streamlit makes
+    on every widget interaction reuse them instead of repeating inference.
+    Results carrying an 'error' are not kept, so a retry runs again.
+    """
+    results = st.session_state.setdefault('analysis_results', {})
+    key = f"{kind}:{content_digest(data)}"
+    if key in results:
+        return results[key]
+
+    with st.spinner(message):
+        animation = st.empty()
+        with animation.container():
+            st_lottie(lottie_spinner, width=200, height=200, key=f"spinner_{kind}")
+        result = compute()
+        animation.empty()
+
+    if not result.get('error'):
+        results[key] = result
+        while len(results) > MAX_SESSION_RESULTS:
+            results.pop(next(iter(results)))
+    return result
 
 # Tabs
 tabs = st.tabs(["🎭 Deepfake Detection", "🧠 AR Phishing Detection", "🎤 Voice Phishing Detection"])
@@ -216,143 +233,131 @@ tabs = st.tabs(["🎭 Deepfake Detection", "🧠 AR Phishing Detection", "🎤 V
 with tabs[0]:
     st.markdown("<div class='card'><h2>Deepfake Image Detection</h2></div>", unsafe_allow_html=True)
     uploaded_img = st.file_uploader("Upload Image for Analysis", type=["jpg", "png", "jpeg"],
-                                    key=f"deepfake_{uuid.uuid4()}")
+                                    key="deepfake_upload")
 
     if uploaded_img:
-        with st.spinner("🔍 Analyzing image..."):
-            st_lottie(lottie_spinner, width=200, height=200)
-            progress = st.progress(0)
-            temp_dir = "temp_files"
-            os.makedirs(temp_dir, exist_ok=True)
-            img_path = os.path.join(temp_dir, "temp_image.jpg")
-
-            try:
-                with open(img_path, "wb") as f:
-                    f.write(uploaded_img.read())
-                progress.progress(33)
-
-                result = models['deepfake'].classify_image(img_path)
-                progress.progress(66)
-
-                # Convert image to base64
-                with Image.open(img_path) as img:
-                    img = img.convert('RGB')
-                    import base64
-                    from io import BytesIO
-
-                    buffered = BytesIO()
-                    img.save(buffered, format="JPEG")
-                    img_str = base64.b64encode(buffered.getvalue()).decode()
+        try:
+            # The upload stays in memory; the classifier decodes the bytes directly
+            image_bytes = uploaded_img.getvalue()
+            result = analyze_once('deepfake', image_bytes, "🔍 Analyzing image...",
+                                  lambda: get_model('deepfake').classify_image(image_bytes))
+            if result.get('error'):
+                raise Exception(result['error'])
+
+            st.image(image_bytes, width=400)
+
+            result_class = "phishing" if result['is_phishing'] else "safe"
+            st.markdown(f"""
+            <div class='card {result_class}'>
+                <h3>Prediction: {result['label']}</h3>
+                <p><strong>Confidence:</strong> {result['confidence']:.1f}%</p>
+                <p><strong>Deep Learning Score:</strong> {result['deep_learning_score']:.1f}%</p>
+                <p><strong>UI Anomalies:</strong></p>
+                <ul style='color: #e0e1dd;'>
+                    <li>Keywords: {', '.join(result['ui_anomalies']['suspicious_keywords'])}</li>
+                    <li>URLs: {', '.join(url['url'] for url in result['ui_anomalies']['suspicious_urls'])}</li>
+                    <li>UI Elements: {', '.join(f"{item['label']} ({item['confidence'] * 100:.1f}%)" for item in result['ui_anomalies']['ui_elements'])}</li>
+                </ul>
+            </div>
+            """, unsafe_allow_html=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(draw_gauge("Confidence", result['confidence'], "#00ff88"), use_container_width=True)
+            with col2:
+                st.plotly_chart(draw_gauge("DL Score", result['deep_learning_score'], "#ff3366"),
+                                use_container_width=True)
+
+        except Exception as e:
+            st.markdown(f"""
+            <div class='card error'>
+                <h3>Error</h3>
+                <p>{str(e)}</p>
+            </div>
+            """, unsafe_allow_html=True)
 
-                st.markdown(
-                    f"<div class='card'><img src='data:image/jpeg;base64,{img_str}' style='width:100%; max-width:400px; border-radius:8px;'/></div>",
-                    unsafe_allow_html=True)
 
-                result_class = "phishing" if result['is_phishing'] else "safe"
-                st.markdown(f"""
-                <div class='card {result_class}'>
-                    <h3>Prediction: {result['label']}</h3>
-                    <p><strong>Confidence:</strong> {result['confidence']:.1f}%</p>
-                    <p><strong>Deep Learning Score:</strong> {result['deep_learning_score']:.1f}%</p>
-                    <p><strong>UI Anomalies:</strong></p>
-                    <ul style='color: #e0e1dd;'>
-                        <li>Keywords: {', '.join(result['ui_anomalies']['suspicious_keywords'])}</li>
-                        <li>URLs: {', '.join(url['url'] for url in result['ui_anomalies']['suspicious_urls'])}</li>
-                        <li>UI Elements: {', '.join(f"{item['label']} ({item['confidence'] * 100:.1f}%)" for item in result['ui_anomalies']['ui_elements'])}</li>
-                    </ul>
-                </div>
-                """, unsafe_allow_html=True)
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.plotly_chart(draw_gauge("Confidence", result['confidence'], "#00ff88"), use_container_width=True)
-                with col2:
-                    st.plotly_chart(draw_gauge("DL Score", result['deep_learning_score'], "#ff3366"),
-                                    use_container_width=True)
-
-                progress.progress(100)
-
-            except Exception as e:
-                st.markdown(f"""
-                <div class='card error'>
-                    <h3>Error</h3>
-                    <p>{str(e)}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-            finally:
-                shutil.rmtree(temp_dir, ignore_errors=True)
+def classify_ar_video(video_bytes, file_ext):
+    # OpenCV can only read video from a path: write it into a private directory
+    # for this upload, removed with its contents once analysed. Uploads are
+    # otherwise handled in memory.
+    with tempfile.TemporaryDirectory(prefix="aura_guard_upload_") as scratch_dir:
+        path = os.path.join(scratch_dir, f"upload.{file_ext}")
+        with open(path, 'wb') as f:
+            f.write(video_bytes)
+        return get_model('deepfake').classify_video(path, pipelined=True)
+
 
 # ---------------- AR Tab ----------------
 with tabs[1]:
     st.markdown("<div class='card'><h2>AR Phishing Detection</h2></div>", unsafe_allow_html=True)
     uploaded_ar = st.file_uploader("Upload Screenshot or Video", type=["jpg", "png", "jpeg", "mp4"],
-                                   key=f"ar_{uuid.uuid4()}")
+                                   key="ar_upload")
 
     if uploaded_ar:
-        with st.spinner("🔍 Analyzing AR content..."):
-            st_lottie(lottie_spinner, width=200, height=200)
-            progress = st.progress(0)
-            temp_dir = "temp_files"
-            os.makedirs(temp_dir, exist_ok=True)
-            file_ext = uploaded_ar.name.split('.')[-1].lower()
-            file_path = os.path.join(temp_dir, f"temp_ar.{file_ext}")
-
-            try:
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_ar.read())
-                progress.progress(33)
-
-                if file_ext in ['jpg', 'jpeg', 'png']:
-                    result = models['deepfake'].classify_image(file_path)
-                    with Image.open(file_path) as img:
-                        img = img.convert('RGB')
-                        import base64
-                        from io import BytesIO
-
-                        buffered = BytesIO()
-                        img.save(buffered, format=file_ext.upper())
-                        img_str = base64.b64encode(buffered.getvalue()).decode()
-                    st.markdown(
-                        f"<div class='card'><img src='data:image/{file_ext};base64,{img_str}' style='width:100%; max-width:400px; border-radius:8px;'/></div>",
-                        unsafe_allow_html=True)
-                else:
-                    result = models['deepfake'].classify_video(file_path)
-                    st.video(file_path)
-
-                result_class = "phishing" if result['is_phishing'] else "safe"
-                st.markdown(f"""
-                <div class='card {result_class}'>
-                    <h3>Prediction: {result['label']}</h3>
-                    <p><strong>Confidence:</strong> {result['confidence']:.1f}%</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-                if file_ext in ['mp4']:
-                    st.plotly_chart(
-                        draw_gauge("Phishing Frame Ratio", result['phishing_frames_ratio'] * 100, "#ff3366"),
-                        use_container_width=True)
-
-                progress.progress(100)
-
-            except Exception as e:
-                st.markdown(f"""
-                <div class='card error'>
-                    <h3>Error</h3>
-                    <p>{str(e)}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-            finally:
-                shutil.rmtree(temp_dir, ignore_errors=True)
+        file_ext = uploaded_ar.name.split('.')[-1].lower()
+
+        try:
+            ar_bytes = uploaded_ar.getvalue()
+            if file_ext in ['jpg', 'jpeg', 'png']:
+                result = analyze_once('ar_image', ar_bytes, "🔍 Analyzing AR content...",
+                                      lambda: get_model('deepfake').classify_image(ar_bytes))
+            else:
+                result = analyze_once('ar_video', ar_bytes, "🔍 Analyzing AR content...",
+                                      lambda: classify_ar_video(ar_bytes, file_ext))
+            if result.get('error'):
+                raise Exception(result['error'])
+
+            if file_ext in ['jpg', 'jpeg', 'png']:
+                st.image(ar_bytes, width=400)
+            else:
+                st.video(ar_bytes)
+
+            result_class = "phishing" if result['is_phishing'] else "safe"
+            st.markdown(f"""
+            <div class='card {result_class}'>
+                <h3>Prediction: {result['label']}</h3>
+                <p><strong>Confidence:</strong> {result['confidence']:.1f}%</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            if file_ext in ['mp4']:
+                st.plotly_chart(
+                    draw_gauge("Phishing Frame Ratio", result['phishing_frames_ratio'] * 100, "#ff3366"),
+                    use_container_width=True)
+                st.markdown(
+                    f"<p style='color: #7780a1;'>Frames analyzed: {result['frames_analyzed']} · "
+                    f"reused from near-identical frames: {result['frames_reused']}</p>",
+                    unsafe_allow_html=True)
+
+        except Exception as e:
+            st.markdown(f"""
+            <div class='card error'>
+                <h3>Error</h3>
+                <p>{str(e)}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+
+def analyze_voice(raw_audio):
+    # Decode once, in memory; the transcriber consumes the array directly
+    audio = decode_audio(raw_audio)
+    audio_result = get_model('transcriber').transcribe_audio(audio)
+    if audio_result['error']:
+        return {'error': audio_result['error']}
+    return {
+        'transcript': audio_result['text'],
+        'nlp': get_model('nlp').detect_phishing_nlp(audio_result['text'])
+    }
+
 
 # ---------------- Voice Tab ----------------
 with tabs[2]:
     st.markdown("<div class='card'><h2>Voice Phishing Detection</h2></div>", unsafe_allow_html=True)
-    uploaded_audio = st.file_uploader("Upload Audio File", type=["mp3", "wav", "m4a"], key=f"audio_{uuid.uuid4()}")
+    uploaded_audio = st.file_uploader("Upload Audio File", type=["mp3", "wav", "m4a"], key="audio_upload")
 
     if uploaded_audio:
-        if not check_ffmpeg():
+        if not ffmpeg_available():
             st.markdown("""
             <div class='card error'>
                 <h3>Error</h3>
@@ -361,74 +366,61 @@ with tabs[2]:
             """, unsafe_allow_html=True)
             st.stop()
 
-        with st.spinner("🔊 Transcribing audio and detecting phishing..."):
-            st_lottie(lottie_spinner, width=200, height=200)
-            progress = st.progress(0)
-            temp_dir = "temp_files"
-            os.makedirs(temp_dir, exist_ok=True)
-            raw_audio_path = os.path.join(temp_dir, "uploaded_audio." + uploaded_audio.name.split('.')[-1])
-            converted_audio_path = os.path.join(temp_dir, "converted_audio.wav")
-
-            try:
-                with open(raw_audio_path, "wb") as f:
-                    f.write(uploaded_audio.read())
-                    f.flush()
-                progress.progress(25)
-
-                ffmpeg_command = [
-                    "ffmpeg", "-y", "-i", raw_audio_path,
-                    "-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le", converted_audio_path
-                ]
-                result = subprocess.run(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-                if result.returncode != 0:
-                    raise Exception(f"FFmpeg conversion failed: {result.stderr.decode()}")
-
-                progress.progress(50)
-
-                audio_result = models['transcriber'].transcribe_audio(converted_audio_path)
-                if audio_result['error']:
-                    raise Exception(audio_result['error'])
-
-                progress.progress(75)
-
-                nlp_result = models['nlp'].detect_phishing_nlp(audio_result['text'])
-                result_class = "phishing" if nlp_result['is_phishing'] else "safe"
-
-                st.audio(converted_audio_path)
-                st.markdown("<div class='card'><h3>📜 Transcript</h3></div>", unsafe_allow_html=True)
-                st.code(audio_result['text'], language='text')
-
-                st.markdown(f"""
-                <div class='card {result_class}'>
-                    <h3>Prediction: {nlp_result['label']}</h3>
-                    <p><strong>Confidence:</strong> {nlp_result['confidence']:.1f}%</p>
-                    <p><strong>NLP Score:</strong> {nlp_result['nlp_score']:.1f}%</p>
-                    <p><strong>Suspicious Phrases:</strong></p>
-                    <ul style='color: #e0e1dd;'>{''.join(f"<li>{kw[0]} ({kw[1] * 100:.1f}%)</li>" for kw in nlp_result['keyword_matches'])}</ul>
-                </div>
-                """, unsafe_allow_html=True)
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.plotly_chart(draw_gauge("Confidence", nlp_result['confidence'], "#00ff88"),
-                                    use_container_width=True)
-                with col2:
-                    st.plotly_chart(draw_gauge("NLP Score", nlp_result['nlp_score'], "#ff3366"),
-                                    use_container_width=True)
-
-                progress.progress(100)
-
-            except Exception as e:
-                st.markdown(f"""
-                <div class='card error'>
-                    <h3>Error</h3>
-                    <p>{str(e)}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-            finally:
-                shutil.rmtree(temp_dir, ignore_errors=True)
+        try:
+            raw_audio = uploaded_audio.getvalue()
+            voice_result = analyze_once('voice', raw_audio, "🔊 Transcribing audio and detecting phishing...",
+                                        lambda: analyze_voice(raw_audio))
+            if voice_result.get('error'):
+                raise Exception(voice_result['error'])
+
+            nlp_result = voice_result['nlp']
+            result_class = "phishing" if nlp_result['is_phishing'] else "safe"
+
+            st.audio(raw_audio)
+            st.markdown("<div class='card'><h3>📜 Transcript</h3></div>", unsafe_allow_html=True)
+            st.code(voice_result['transcript'], language='text')
+
+            st.markdown(f"""
+            <div class='card {result_class}'>
+                <h3>Prediction: {nlp_result['label']}</h3>
+                <p><strong>Confidence:</strong> {nlp_result['confidence']:.1f}%</p>
+                <p><strong>NLP Score:</strong> {nlp_result['nlp_score']:.1f}%</p>
+                <p><strong>Suspicious Phrases:</strong></p>
+                <ul style='color: #e0e1dd;'>{''.join(f"<li>{kw[0]} ({kw[1] * 100:.1f}%)</li>" for kw in nlp_result['keyword_matches'])}</ul>
+            </div>
+            """, unsafe_allow_html=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(draw_gauge("Confidence", nlp_result['confidence'], "#00ff88"),
+                                use_container_width=True)
+            with col2:
+                st.plotly_chart(draw_gauge("NLP Score", nlp_result['nlp_score'], "#ff3366"),
+                                use_container_width=True)
+
+        except Exception as e:
+            st.markdown(f"""
+            <div class='card error'>
+                <h3>Error</h3>
+                <p>{str(e)}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+# Startup report: render time of this run and the first-load time of each model
+with model_status.container():
+    st.markdown(f"**Page ready in {time.perf_counter() - SCRIPT_START:.2f}s**")
+    st.markdown("**Loaded Models**")
+    loaded = registry.load_report()
+    st.markdown("\n".join(f"- {name} ({seconds:.1f}s)" for name, _, seconds in loaded) or "- none yet")
+
+# Check GPU availability; torch is only imported once a model has loaded it
+if loaded and not sys.modules['torch'].cuda.is_available():
+    st.markdown("""
+    <div class='card error'>
+        <h3>Warning</h3>
+        <p>Running on CPU. For better performance, consider using a GPU with CUDA support.</p>
+    </div>
+    """, unsafe_allow_html=True)
 
 # Footer
 st.markdown("""
@@ -0,0 +1,76 @@
+# deepfake_detector_core/backends.py
+import os
+import numpy as np
+
+BACKENDS = ('torch', 'onnx')
+
+# Exported graphs are reused across runs; override with AURA_GUARD_ONNX_CACHE
+ONNX_CACHE_DIR = os.environ.get(
+    'AURA_GUARD_ONNX_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'aura_guard', 'onnx')
+)
+
+
+def check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    return backend
+
+
+def onnx_cache_path(name):
+    """Path of the cached ONNX graph for a model name."""
+    return os.path.join(ONNX_CACHE_DIR, f"{name}.onnx")
+
+
+def export_onnx(model, example_inputs, name, input_names, output_names, dynamic_axes):
+    """
+    Export a torch module to ONNX once and return the cached file path.
+    example_inputs is a tuple of tensors matching input_names.
+    """
+    import torch
+
+    path = onnx_cache_path(name)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(ONNX_CACHE_DIR, exist_ok=True)
+    # Write to a temporary name first so a failed export never leaves a broken cache entry
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            model.cpu().eval(), example_inputs, tmp_path,
+            input_names=input_names, output_names=output_names,
+            dynamic_axes=dynamic_axes, opset_version=14
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+class OnnxRunner:
+    """
+    ONNX Runtime session on the CPU execution provider.
+
+    Called with named torch tensors or arrays, returns the first output as a
+    torch tensor so it can stand in for a torch module's forward pass.
+    """
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+        import torch
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads or torch.get_num_threads()
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, **inputs):
+        import torch
+
+        feed = {}
+        for name in self.input_names:
+            value = inputs[name]
+            if isinstance(value, torch.Tensor):
+                value = value.detach().cpu().numpy()
+            feed[name] = np.ascontiguousarray(value)
+        return torch.from_numpy(self.session.run(None, feed)[0])
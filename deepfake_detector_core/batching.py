@@ -0,0 +1,101 @@
+# deepfake_detector_core/batching.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-item requests into batches.
+
+    Callers submit one item at a time from any thread. A background worker waits
+    up to max_wait_ms after the first pending item for more to arrive, then
+    passes up to max_batch_size items to batch_fn in one call. batch_fn must
+    return one result per item, in order. Items whose Future is cancelled before
+    their batch starts are skipped.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=5.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._closed = False
+        # Serialises submit() against close(), so nothing is queued behind the sentinel
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """Queue an item and return a Future for its result."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((item, future))
+        return future
+
+    def __call__(self, item):
+        """Submit an item and block until its result is ready."""
+        return self.submit(item).result()
+
+    def close(self):
+        """Stop accepting items and finish the ones already queued."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                # Re-queue the sentinel so the run loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                self._fail_pending()
+                return
+            # Drop items whose caller cancelled while they were queued; the rest can
+            # no longer be cancelled, so setting their results below cannot fail
+            batch = [(item, future) for item, future in self._collect(entry)
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = list(self.batch_fn([item for item, _ in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _fail_pending(self):
+        # Defensive: anything still queued after the sentinel would otherwise never resolve
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not None and entry[1].set_running_or_notify_cancel():
+                entry[1].set_exception(RuntimeError("MicroBatcher is closed"))
@@ -0,0 +1,40 @@
+# deepfake_detector_core/image_io.py
+import os
+import cv2
+import numpy as np
+
+
+def load_image(source):
+    """
+    Decode an image given as a file path, raw encoded bytes or an ndarray.
+
+    Returns a BGR uint8 array, the same layout as cv2.imread, so arrays coming
+    from video frames and from files can be handled the same way.
+    """
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        img = cv2.imdecode(np.frombuffer(source, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError("Failed to decode image bytes")
+        return img
+    if isinstance(source, (str, os.PathLike)):
+        img = cv2.imread(os.fspath(source))
+        if img is None:
+            raise ValueError(f"Failed to load image: {source}")
+        return img
+    raise TypeError(f"Unsupported image input: {type(source).__name__}")
+
+
+def to_rgb(image):
+    """Convert a decoded BGR array into RGB without re-reading the source."""
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def describe_source(source):
+    """Short human-readable label for an image input, for log messages."""
+    if isinstance(source, np.ndarray):
+        return f"<array {source.shape}>"
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{len(source)} bytes>"
+    return str(source)
@@ -1,40 +1,294 @@
 # ar_phishing_detector/inference.py
-import torch
-import torchvision.transforms as transforms
+import os
 from PIL import Image
 import numpy as np
-from ar_phishing_detector.ui_analyzer import analyze_ui_anomalies
+from .backends import OnnxRunner, check_backend, export_onnx, onnx_cache_path
+from .batching import MicroBatcher
+from .image_io import load_image, to_rgb, describe_source
+from .metrics import span, timed
 from .model import load_xception_model
+from .model_registry import get_model, registry
+from .quantization import check_precision, inference_context
 
 
-class PhishingClassifier:
+def _tf():
+    # torch and torchvision are only imported once a classifier is used
+    import torchvision.transforms.functional as TF
+    return TF
+
+
+# Fixed test-time augmentations, applied to the resized PIL image. They mirror
+# the flip/rotation/colour ranges the model used to see through random transforms.
+TTA_AUGMENTATIONS = [
+    lambda img: img,
+    lambda img: _tf().hflip(img),
+    lambda img: _tf().rotate(img, 5),
+    lambda img: _tf().rotate(img, -5),
+    lambda img: _tf().adjust_brightness(img, 1.1),
+    lambda img: _tf().adjust_contrast(img, 1.1),
+]
+
+# Stages of the classify_image cascade: OCR keyword/URL scan, Xception, YOLO
+CASCADE_STAGES = ('ocr', 'xception', 'yolo')
+
+# Frame sampling options classify_video honours without the pipeline, with their
+# defaults; the other VideoPipeline options (batching, worker counts) only apply
+# with pipelined=True and do not change the result
+VIDEO_FRAME_OPTIONS = {'frame_rate': 15, 'max_frames': 100, 'max_hash_distance': 4}
+
+
+class VideoScoreAggregator:
+    """
+    Running aggregation of frame-level results into a video verdict.
+
+    Frames must be added in order: a reused (deduplicated) frame takes the score
+    of the last analysed frame before it.
+    """
+
     def __init__(self):
-        self.model = load_xception_model()
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
+        self.frame_results = []
+        self.total_confidence = 0.0
+        self.phishing_count = 0
+        self.reused_count = 0
+        self._last_confidence = 0.0
+
+    def add(self, index, frame_result, dl_score=None, reused=False):
+        self.frame_results.append((index, frame_result))
+
+        if reused:
+            self.reused_count += 1
+            frame_confidence = self._last_confidence
+        else:
+            frame_confidence = frame_result.get('confidence', 0.0)
+            if dl_score is not None:
+                frame_confidence = (frame_confidence * 0.4 + dl_score * 0.6)
+            self._last_confidence = frame_confidence
+
+        self.total_confidence += frame_confidence
+        if frame_confidence > 0.65:
+            self.phishing_count += 1
+
+    def result(self):
+        frame_results = self.frame_results
+        if not frame_results:
+            return {
+                'label': 'Error',
+                'confidence': 0.0,
+                'is_phishing': False,
+                'error': 'No frames extracted'
+            }
+
+        avg_confidence = self.total_confidence / len(frame_results)
+        is_phishing = avg_confidence > 0.65 or self.phishing_count / len(frame_results) > 0.25
+
+        return {
+            'label': 'Phishing' if is_phishing else 'Legitimate',
+            'confidence': round(avg_confidence * 100, 2),
+            'phishing_frames_ratio': self.phishing_count / len(frame_results),
+            'frames_analyzed': len(frame_results) - self.reused_count,
+            'frames_reused': self.reused_count,
+            'is_phishing': is_phishing,
+            'frame_results': frame_results
+        }
+
+
+class PhishingClassifier:
+    # Bump when scoring changes so cached results are not reused
+    CACHE_VERSION = "1"
+
+    # Name of the cached ONNX export of the Xception classifier
+    ONNX_MODEL_NAME = "phishing_classifier_xception"
+
+    def __init__(self, tta=False, tta_views=len(TTA_AUGMENTATIONS), cache=None, precision='fp32',
+                 backend='torch', cascade=None):
+        """
+        tta=False gives a deterministic score per image. With tta=True the first
+        tta_views entries of TTA_AUGMENTATIONS are stacked into one batch and their
+        scores averaged, so augmentation costs a single forward pass.
+        cache is an optional ResultCache for classify_image and classify_video.
+        precision selects CPU inference mode: 'fp32', 'int8' (dynamic quantisation,
+        which only reaches the classifier head, so it is replaced by fp32 when CUDA
+        is available) or 'bf16' (autocast, where the CPU supports it).
+        backend='onnx' runs an exported ONNX graph through ONNX Runtime (fp32 only),
+        falling back to torch if it cannot be exported or loaded.
+        cascade is an optional order of CASCADE_STAGES for classify_image, e.g.
+        ('ocr', 'xception', 'yolo'): stages run in that order and the rest are
+        skipped as soon as the verdict can no longer change.
+        """
+        if cascade is not None and sorted(cascade) != sorted(CASCADE_STAGES):
+            raise ValueError(f"cascade must order each of {CASCADE_STAGES} once, got {cascade}")
+        self.cascade = tuple(cascade) if cascade is not None else None
+        import torch
+        import torchvision.transforms as transforms
+
+        check_precision(precision)
+        if precision == 'int8':
+            # Dynamic quantisation only reaches nn.Linear layers: the 2048->1 head here,
+            # not the convolutions that dominate the cost, so int8 gains next to nothing
+            if torch.cuda.is_available():
+                print("INT8 only quantises Xception's classifier head; keeping FP32 on CUDA instead")
+                precision = 'fp32'
+            else:
+                print("Warning: INT8 only quantises Xception's classifier head, expect little speed-up")
+        self.precision = precision
+        self.backend = check_backend(backend)
+        self.model = None
+        self.onnx_runner = None
+
+        if self.backend == 'onnx':
+            if precision == 'fp32':
+                self._load_onnx()
+            else:
+                print(f"ONNX backend supports fp32 only, using torch for {precision}")
+        if self.onnx_runner is None:
+            self.backend = 'torch'
+            self.model = load_xception_model(precision)
+            self.model_name = type(self.model).__name__
+
+        # Quantised models and ONNX Runtime sessions only run on CPU
+        use_cuda = torch.cuda.is_available() and precision != 'int8' and self.backend == 'torch'
+        self.device = torch.device("cuda" if use_cuda else "cpu")
+        if self.model is not None:
+            self.model.to(self.device)
+        self.resize = transforms.Resize((299, 299))
         self.transform = transforms.Compose([
-            transforms.Resize((299, 299)),
-            transforms.RandomHorizontalFlip(p=0.3),  # Reduced augmentation for stability
-            transforms.RandomRotation(5),  # Tighter rotation for UI consistency
-            transforms.ColorJitter(brightness=0.1, contrast=0.1, saturation=0.1),
             transforms.ToTensor(),
             transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
         ])
+        self.augmentations = TTA_AUGMENTATIONS[:tta_views] if tta else TTA_AUGMENTATIONS[:1]
+        self.cache = cache
+
+    def _load_onnx(self):
+        """
+        Load the cached ONNX export of Xception, exporting it on first use. A cached
+        export lets later processes start without building the torch model at all.
+        """
+        import torch
+
+        try:
+            path = onnx_cache_path(self.ONNX_MODEL_NAME)
+            if not os.path.exists(path):
+                model = load_xception_model()
+                if type(model).__name__ != 'Xception':
+                    raise RuntimeError("Xception unavailable, not exporting the fallback model")
+                path = export_onnx(
+                    model, (torch.zeros(1, 3, 299, 299),), self.ONNX_MODEL_NAME,
+                    input_names=['input'], output_names=['logits'],
+                    dynamic_axes={'input': {0: 'batch'}, 'logits': {0: 'batch'}}
+                )
+            self.onnx_runner = OnnxRunner(path)
+            self.model_name = 'Xception'
+        except Exception as e:
+            print(f"Error loading ONNX backend, falling back to torch: {str(e)}")
+
+    @property
+    def cache_version(self):
+        """
+        Everything that changes a classify_image result: this model's settings and
+        those registered for the YOLO and OCR models (OCR mode, keyword list,
+        blocklist), so caches shared between differently configured runs never
+        return each other's results. Built from the registry's settings, so a
+        lookup never loads YOLO or EasyOCR.
+        """
+        version = (f"{self.CACHE_VERSION}:{self.model_name}:{self.backend}:{self.precision}"
+                   f":views={self.views_per_image}")
+        if self.cascade:
+            version += f":cascade={'>'.join(self.cascade)}"
+        for name in ('yolo', 'ocr'):
+            version += f":{name}={registry.settings_key(name)}"
+        return version
+
+    def video_cache_version(self, dedup, pipeline_options):
+        """cache_version plus the frame sampling settings of a classify_video call."""
+        options = dict(VIDEO_FRAME_OPTIONS)
+        options.update((key, value) for key, value in pipeline_options.items() if key in VIDEO_FRAME_OPTIONS)
+        sampling = ",".join(f"{key}={value}" for key, value in sorted(options.items()))
+        return f"{self.cache_version}:dedup={dedup}:{sampling}"
+
+    @property
+    def views_per_image(self):
+        return len(self.augmentations)
 
     def preprocess_image(self, image_path):
-        """Preprocess image with robust error handling and optimized augmentation."""
+        """
+        Preprocess image with robust error handling.
+
+        Returns a (views_per_image, 3, 299, 299) tensor: one row without TTA, one
+        row per augmentation with it.
+        """
+        import torch
+
         try:
-            img = Image.open(image_path).convert("RGB")
-            input_tensor = self.transform(img).unsqueeze(0).to(self.device)
+            with span('xception.preprocess'):
+                img = self.resize(Image.fromarray(to_rgb(load_image(image_path))))
+                views = [self.transform(augment(img)) for augment in self.augmentations]
+                input_tensor = torch.stack(views).to(self.device)
             return input_tensor
         except Exception as e:
-            print(f"Error preprocessing image {image_path}: {str(e)}")
+            print(f"Error preprocessing image {describe_source(image_path)}: {str(e)}")
             return None
 
+    def _dl_scores(self, input_batch):
+        """
+        Run Xception on a batch of preprocessed images and return one sigmoid score
+        per image, averaging over the TTA views of each image.
+        """
+        import torch
+
+        with span('xception.forward'), torch.no_grad(), inference_context(self.precision):
+            if self.onnx_runner is not None:
+                output = self.onnx_runner(input=input_batch)
+            else:
+                output = self.model(input_batch)
+            scores = torch.sigmoid(output[:, 0].float()).view(-1, self.views_per_image)
+            return scores.mean(dim=1).tolist()
+
+    def _combine_scores(self, dl_score, ui_results):
+        """Ensemble the deep learning score with the UI analysis result."""
+        if 'error' in ui_results:
+            ui_confidence = 0.0
+        else:
+            ui_confidence = ui_results.get('confidence', 0.0)
+
+        # Ensemble scoring with adjusted weights
+        final_confidence = (
+                dl_score * 0.6 +  # Increased weight for deep learning
+                ui_confidence * 0.4  # UI analysis contribution
+        )
+        label = "Phishing" if final_confidence > 0.65 else "Legitimate"  # Lowered threshold
+        is_phishing = final_confidence > 0.65
+
+        return {
+            'label': label,
+            'confidence': round(final_confidence * 100, 2),
+            'is_phishing': is_phishing,
+            'deep_learning_score': round(dl_score * 100, 2),
+            'ui_anomalies': ui_results
+        }
+
+    @timed('classify_image')
     def classify_image(self, image_path):
-        """Classify image using ensemble of deep learning and UI analysis."""
+        """
+        Classify image using ensemble of deep learning and UI analysis.
+        With metrics enabled the result carries a per-stage 'timings' breakdown in ms.
+        """
+        if self.cache is None:
+            return self._classify_image(image_path)
+        return self.cache.cached_call('classify_image', self.cache_version, image_path,
+                                      lambda: self._classify_image(image_path))
+
+    def _classify_image(self, image_path):
+        from ar_phishing_detector.ui_analyzer import analyze_ui_anomalies
+
         try:
-            input_tensor = self.preprocess_image(image_path)
+            # Decode once; Xception, YOLO and OCR all read from this buffer
+            with span('image.decode'):
+                img = load_image(image_path)
+
+            if self.cascade:
+                return self._classify_image_cascade(img)
+
+            input_tensor = self.preprocess_image(img)
             if input_tensor is None:
                 return {
                     'label': 'Error',
@@ -44,35 +298,14 @@ class PhishingClassifier:
                 }
 
             # Deep learning classification
-            with torch.no_grad():
-                output = self.model(input_tensor)
-                dl_score = torch.sigmoid(output[0][0]).item()
+            dl_score = self._dl_scores(input_tensor)[0]
 
             # UI analysis
-            ui_results = analyze_ui_anomalies(image_path)
-            if 'error' in ui_results:
-                ui_confidence = 0.0
-            else:
-                ui_confidence = ui_results.get('confidence', 0.0)
-
-            # Ensemble scoring with adjusted weights
-            final_confidence = (
-                    dl_score * 0.6 +  # Increased weight for deep learning
-                    ui_confidence * 0.4  # UI analysis contribution
-            )
-            label = "Phishing" if final_confidence > 0.65 else "Legitimate"  # Lowered threshold
-            is_phishing = final_confidence > 0.65
-
-            return {
-                'label': label,
-                'confidence': round(final_confidence * 100, 2),
-                'is_phishing': is_phishing,
-                'deep_learning_score': round(dl_score * 100, 2),
-                'ui_anomalies': ui_results
-            }
+            ui_results = analyze_ui_anomalies(img)
+            return self._combine_scores(dl_score, ui_results)
 
         except Exception as e:
-            print(f"Error classifying image {image_path}: {str(e)}")
+            print(f"Error classifying image {describe_source(image_path)}: {str(e)}")
             return {
                 'label': 'Error',
                 'confidence': 0.0,
@@ -80,49 +313,180 @@ class PhishingClassifier:
                 'error': str(e)
             }
 
-    def classify_video(self, video_path):
-        """Classify video by aggregating frame-level results."""
-        from .ui_analyzer import analyze_video_ui
+    @staticmethod
+    def _score_bounds(dl_score, ui_confidence, ui_complete):
+        """
+        Range the final score can still reach. An unknown Xception score spans
+        [0, 1]; the UI score only grows as stages are added (capped at 1).
+        """
+        dl_low, dl_high = (0.0, 1.0) if dl_score is None else (dl_score, dl_score)
+        ui_high = ui_confidence if ui_complete else 1.0
+        return dl_low * 0.6 + ui_confidence * 0.4, dl_high * 0.6 + ui_high * 0.4
+
+    def _classify_image_cascade(self, img):
+        """
+        Run the cascade stages in order, stopping once the bounds on the final
+        score (0.6 * dl + 0.4 * ui) lie entirely on one side of the 0.65
+        threshold. The verdict is always the one the full ensemble would give;
+        the reported confidence counts skipped stages at their lowest possible score.
+        """
+        from ar_phishing_detector.ui_analyzer import score_ui_anomalies
+
+        ocr = get_model('ocr')
+        dl_score = None
+        ui_elements = None
+        text, ocr_results = None, None
+        stages_run = []
+
+        def bounds():
+            ui = score_ui_anomalies(ui_elements or [], text or '', ocr_results or [], ocr)
+            ui_complete = text is not None and ui_elements is not None
+            return ui, self._score_bounds(dl_score, ui['confidence'], ui_complete)
+
+        for stage in self.cascade:
+            _, (low, high) = bounds()
+            if low > 0.65 or high <= 0.65:
+                break
+
+            if stage == 'ocr':
+                text, ocr_results = ocr.extract_text(img)
+            elif stage == 'xception':
+                input_tensor = self.preprocess_image(img)
+                if input_tensor is None:
+                    return {
+                        'label': 'Error',
+                        'confidence': 0.0,
+                        'is_phishing': False,
+                        'error': 'Image preprocessing failed'
+                    }
+                dl_score = self._dl_scores(input_tensor)[0]
+            else:
+                ui_elements = get_model('yolo').detect_ui_elements(img)
+            stages_run.append(stage)
+
+        ui_results, (low, high) = bounds()
+        result = self._combine_scores(dl_score or 0.0, ui_results)
+        if dl_score is None:
+            result['deep_learning_score'] = None
+        result['stages_run'] = stages_run
+        result['stages_skipped'] = [stage for stage in self.cascade if stage not in stages_run]
+        result['confidence_bounds'] = [round(low * 100, 2), round(high * 100, 2)]
+        return result
+
+    def classify_batch(self, images, batch_size=8):
+        """
+        Classify many images (paths, encoded bytes or BGR arrays) at once.
+
+        Xception runs on up to batch_size images per forward pass; results are
+        returned in input order, in the same format as classify_image.
+        """
+        import torch
+        from ar_phishing_detector.ui_analyzer import analyze_ui_anomalies
+
+        images = list(images)
+        results = [None] * len(images)
+
+        for start in range(0, len(images), batch_size):
+            indices = []
+            tensors = []
+            for i in range(start, min(start + batch_size, len(images))):
+                try:
+                    images[i] = load_image(images[i])
+                except Exception as e:
+                    print(f"Error loading image {describe_source(images[i])}: {str(e)}")
+                input_tensor = self.preprocess_image(images[i])
+                if input_tensor is None:
+                    results[i] = {
+                        'label': 'Error',
+                        'confidence': 0.0,
+                        'is_phishing': False,
+                        'error': 'Image preprocessing failed'
+                    }
+                    continue
+                indices.append(i)
+                tensors.append(input_tensor)
+
+            if not tensors:
+                continue
+
+            try:
+                dl_scores = self._dl_scores(torch.cat(tensors))
+            except Exception as e:
+                print(f"Error in batched classification: {str(e)}")
+                for i in indices:
+                    results[i] = {
+                        'label': 'Error',
+                        'confidence': 0.0,
+                        'is_phishing': False,
+                        'error': str(e)
+                    }
+                continue
+
+            for i, dl_score in zip(indices, dl_scores):
+                ui_results = analyze_ui_anomalies(images[i])
+                results[i] = self._combine_scores(dl_score, ui_results)
+
+        return results
+
+    def micro_batcher(self, max_batch_size=8, max_wait_ms=5.0):
+        """
+        Return a MicroBatcher that groups concurrent classify requests.
+
+        Calling the returned object with a single image blocks until its result
+        is ready; requests arriving within max_wait_ms of each other share one
+        Xception forward pass.
+        """
+        return MicroBatcher(
+            lambda items: self.classify_batch(items, batch_size=max_batch_size),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        )
+
+    @timed('classify_video')
+    def classify_video(self, video_path, dedup=True, pipelined=False, **pipeline_options):
+        """
+        Classify video by aggregating frame-level results.
+
+        Frames are decoded in memory and consumed one at a time, so only the
+        current frame is held while YOLO, OCR and Xception run on it. With dedup,
+        near-identical consecutive frames reuse the previous frame's score.
+        pipelined=True runs decode, detection and OCR concurrently through
+        VideoPipeline (pipeline_options are passed to it); the aggregation is the same.
+        Without it only the VIDEO_FRAME_OPTIONS are accepted, and any other option
+        raises TypeError.
+        With metrics enabled the result carries a per-stage 'timings' breakdown in ms.
+        """
+        if not pipelined:
+            unsupported = sorted(set(pipeline_options) - set(VIDEO_FRAME_OPTIONS))
+            if unsupported:
+                raise TypeError(f"classify_video options {unsupported} require pipelined=True")
+        if self.cache is None:
+            return self._classify_video(video_path, dedup, pipelined, pipeline_options)
+        version = self.video_cache_version(dedup, pipeline_options)
+        return self.cache.cached_call('classify_video', version, video_path,
+                                      lambda: self._classify_video(video_path, dedup, pipelined, pipeline_options))
+
+    def _classify_video(self, video_path, dedup, pipelined, pipeline_options):
+        from ar_phishing_detector.ui_analyzer import iter_frame_results
+
         try:
-            video_results = analyze_video_ui(video_path)
-            if 'error' in video_results:
-                return {
-                    'label': 'Error',
-                    'confidence': 0.0,
-                    'is_phishing': False,
-                    'error': video_results['error']
-                }
+            if pipelined:
+                from .video_pipeline import VideoPipeline
+                return VideoPipeline(self, dedup=dedup, **pipeline_options).run(video_path)
 
-            # Aggregate frame-level classifications
-            frame_results = video_results['frame_results']
-            total_confidence = 0.0
-            phishing_count = 0
+            aggregator = VideoScoreAggregator()
 
-            for _, frame_result in frame_results:
+            for index, frame, frame_result, reused in iter_frame_results(video_path, dedup=dedup,
+                                                                         **pipeline_options):
+                dl_score = None
                 # Run deep learning on select frames for efficiency
-                frame_confidence = frame_result.get('confidence', 0.0)
-                if frame_result.get('is_phishing', False):
-                    input_tensor = self.preprocess_image(frame_result[0])
+                if not reused and frame_result.get('is_phishing', False):
+                    input_tensor = self.preprocess_image(frame)
                     if input_tensor is not None:
-                        with torch.no_grad():
-                            output = self.model(input_tensor)
-                            dl_score = torch.sigmoid(output[0][0]).item()
-                        frame_confidence = (frame_confidence * 0.4 + dl_score * 0.6)
-
-                total_confidence += frame_confidence
-                if frame_confidence > 0.65:
-                    phishing_count += 1
-
-            avg_confidence = total_confidence / len(frame_results) if frame_results else 0.0
-            is_phishing = avg_confidence > 0.65 or phishing_count / len(frame_results) > 0.25
+                        dl_score = self._dl_scores(input_tensor)[0]
+                aggregator.add(index, frame_result, dl_score, reused)
 
-            return {
-                'label': 'Phishing' if is_phishing else 'Legitimate',
-                'confidence': round(avg_confidence * 100, 2),
-                'phishing_frames_ratio': phishing_count / len(frame_results) if frame_results else 0.0,
-                'is_phishing': is_phishing,
-                'frame_results': video_results['frame_results']
-            }
+            return aggregator.result()
 
         except Exception as e:
             print(f"Error classifying video {video_path}: {str(e)}")
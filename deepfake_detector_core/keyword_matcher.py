@@ -0,0 +1,116 @@
+# deepfake_detector_core/keyword_matcher.py
+import re
+
+
+def load_keywords(path):
+    """Read one keyword or phrase per line, skipping blank lines and # comments."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip().lower() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def _char_pattern(ch):
+    # Any run of whitespace in the text matches a single space in a phrase
+    return r'\s+' if ch == ' ' else re.escape(ch)
+
+
+def trie_pattern(words):
+    """
+    Build a prefix-factored regex alternation matching any of words.
+
+    Shared prefixes are matched once ("secur(?:e|ity)" rather than
+    "secure|security"), so the regex engine does not retry every word at every
+    position and large word lists stay fast. Longer words are preferred.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [_char_pattern(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if '' in node:
+            return '(?:' + '|'.join(branches) + ')?'
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Single-pass keyword and context-phrase matcher.
+
+    All keywords are compiled into one word-boundary-aware regex, built once. Each
+    keyword found scores base_confidence, or context_confidence when at least one
+    occurrence is directly preceded by one of prefixes or followed by one of
+    suffixes (e.g. "urgent login", "verify now"). Keywords contained in longer
+    ones ("security" in "security alert") are reported as well.
+    """
+
+    def __init__(self, keywords, prefixes=(), suffixes=(), base_confidence=0.6, context_confidence=0.9):
+        self.keywords = list(dict.fromkeys(kw.lower() for kw in keywords if kw.strip()))
+        self.base_confidence = base_confidence
+        self.context_confidence = context_confidence
+        self._order = {kw: i for i, kw in enumerate(self.keywords)}
+
+        self._keyword_re = None
+        if self.keywords:
+            # Zero-width match at every word start, capturing the longest keyword there,
+            # so overlapping occurrences are all found in one scan
+            self._keyword_re = re.compile(r'(?<!\w)(?=(' + trie_pattern(self.keywords) + r')(?!\w))')
+
+        # Shorter keywords that are word-prefixes of a longer one ("security" -> "security alert")
+        keyword_set = set(self.keywords)
+        self._prefix_keywords = {}
+        for kw in self.keywords:
+            self._prefix_keywords[kw] = [
+                (kw[:j], re.compile(trie_pattern([kw[:j]]))) for j in range(1, len(kw))
+                if not kw[j].isalnum() and kw[j - 1].isalnum() and kw[:j] in keyword_set
+            ]
+
+        prefixes = [p.lower() for p in prefixes]
+        suffixes = [s.lower() for s in suffixes]
+        self._max_prefix_len = max((len(p) for p in prefixes), default=0) + 8
+        self._prefix_re = re.compile(r'(?<!\w)(?:' + trie_pattern(prefixes) + r')\s+$') if prefixes else None
+        self._suffix_re = re.compile(r'\s+(?:' + trie_pattern(suffixes) + r')(?!\w)') if suffixes else None
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(load_keywords(path), **kwargs)
+
+    def _has_context(self, text, start, end):
+        if self._suffix_re is not None and self._suffix_re.match(text, end):
+            return True
+        if self._prefix_re is not None and self._prefix_re.search(text, max(0, start - self._max_prefix_len), start):
+            return True
+        return False
+
+    def find(self, text):
+        """
+        Return [(keyword, confidence), ...] for every keyword present in text,
+        once each, in keyword-list order.
+        """
+        if not text or self._keyword_re is None:
+            return []
+
+        text = text.lower()
+        found = {}
+        for match in self._keyword_re.finditer(text):
+            start, end = match.span(1)
+            keyword = ' '.join(match.group(1).split())
+            confidence = self.context_confidence if self._has_context(text, start, end) else self.base_confidence
+            if found.get(keyword, 0.0) < confidence:
+                found[keyword] = confidence
+            for prefix_kw, prefix_re in self._prefix_keywords.get(keyword, ()):
+                prefix_end = prefix_re.match(text, start).end()
+                prefix_conf = self.context_confidence if self._has_context(text, start, prefix_end) \
+                    else self.base_confidence
+                if found.get(prefix_kw, 0.0) < prefix_conf:
+                    found[prefix_kw] = prefix_conf
+
+        return sorted(found.items(), key=lambda item: self._order[item[0]])
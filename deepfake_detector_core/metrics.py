@@ -0,0 +1,211 @@
+# deepfake_detector_core/metrics.py
+import atexit
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+# Instrumentation is off unless AURA_GUARD_METRICS is set (or enable() is called).
+# With AURA_GUARD_METRICS_FILE set, the histograms are written there at exit.
+ENV_FLAG = 'AURA_GUARD_METRICS'
+ENV_FILE = 'AURA_GUARD_METRICS_FILE'
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = os.environ.get(ENV_FLAG, '').lower() not in ('', '0', 'false', 'no')
+
+# Shared no-op context returned by span() while disabled, so a disabled span costs
+# one global lookup and no allocation
+_NULL_SPAN = contextlib.nullcontext()
+
+# Per-call collector of stage timings; None outside a timed() call
+_current_timings = contextvars.ContextVar('aura_guard_timings', default=None)
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled():
+    return _enabled
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class StageMetrics:
+    """Process-wide latency histograms, one per stage name."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = _Histogram()
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        """Return {stage: {'count', 'sum', 'buckets': {le: cumulative count}}}."""
+        with self._lock:
+            snapshot = {}
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                snapshot[stage] = {'count': histogram.count, 'sum': histogram.sum, 'buckets': buckets}
+            return snapshot
+
+    def to_prometheus(self, metric='aura_guard_stage_seconds'):
+        """Render the histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {metric} Time spent in each pipeline stage.",
+            f"# TYPE {metric} histogram",
+        ]
+        for stage, data in self.snapshot().items():
+            label = stage.replace('\\', '\\\\').replace('"', '\\"')
+            for bound, count in data['buckets'].items():
+                lines.append(f'{metric}_bucket{{stage="{label}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_sum{{stage="{label}"}} {data["sum"]:.6f}')
+            lines.append(f'{metric}_count{{stage="{label}"}} {data["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the histograms to path: JSON for a .json file, Prometheus text otherwise."""
+        content = json.dumps(self.snapshot(), indent=2) if path.endswith('.json') else self.to_prometheus()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+stage_metrics = StageMetrics()
+
+
+class _Timings:
+    """Stage durations collected during one timed() call; shared with worker threads."""
+
+    def __init__(self):
+        self.seconds = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def merge(self, other):
+        for stage, seconds in other.seconds.items():
+            self.add(stage, seconds)
+
+    def as_ms(self):
+        with self._lock:
+            return {stage: round(seconds * 1000, 3) for stage, seconds in self.seconds.items()}
+
+
+def record(stage, seconds):
+    """Record a stage duration in the histograms and in the current call's timings."""
+    stage_metrics.observe(stage, seconds)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+class _Span:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def span(stage):
+    """Context manager timing a pipeline stage; a shared no-op while metrics are disabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(stage)
+
+
+def timed(stage):
+    """
+    Decorator for pipeline entry points that return a result dict.
+
+    The whole call is recorded as stage, and every span entered during it
+    (including in nested timed calls) is summed into result['timings'] as
+    {stage: milliseconds}. Disabled, the wrapped function is called directly.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            parent = _current_timings.get()
+            timings = _Timings()
+            token = _current_timings.set(timings)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                _current_timings.reset(token)
+                timings.add(stage, time.perf_counter() - start)
+                stage_metrics.observe(stage, timings.seconds[stage])
+                if parent is not None:
+                    parent.merge(timings)
+            if isinstance(result, dict):
+                result['timings'] = timings.as_ms()
+            return result
+        return wrapper
+    return decorator
+
+
+def in_current_context(fn):
+    """
+    Bind fn to a copy of the caller's context, so spans it enters on a pool thread
+    still count towards the caller's timings. Returns fn unchanged while disabled.
+    """
+    if not _enabled:
+        return fn
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def _write_at_exit():
+    path = os.environ.get(ENV_FILE)
+    if path and _enabled:
+        try:
+            stage_metrics.write(path)
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {str(e)}")
+
+
+atexit.register(_write_at_exit)
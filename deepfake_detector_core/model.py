@@ -1,12 +1,15 @@
 # ar_phishing_detector/model.py
-import torch
-import timm
+from .quantization import quantize_model
 
 
-def load_xception_model():
+def load_xception_model(precision='fp32'):
     """
     Load Xception model optimized for phishing detection with fallback.
+    precision='int8' returns a dynamically quantised copy for CPU inference.
     """
+    # Imported here so that importing the package does not pull in timm
+    import timm
+
     try:
         # Load Xception model using timm
         model = timm.create_model('xception', pretrained=True, num_classes=1)
@@ -18,14 +21,14 @@ def load_xception_model():
         #     print("Fine-tuned weights not found, using pretrained model")
 
         model.eval()
-        return model
+        return quantize_model(model, precision)
     except Exception as e:
         print(f"Error loading Xception model: {str(e)}")
         # Fallback to EfficientNet-B0
         try:
             model = timm.create_model('tf_efficientnet_b0_ns', pretrained=True, num_classes=1)
             model.eval()
-            return model
+            return quantize_model(model, precision)
         except Exception as e2:
             print(f"Error loading fallback model: {str(e2)}")
             raise RuntimeError("Failed to load any model")
\ No newline at end of file
@@ -0,0 +1,174 @@
+# deepfake_detector_core/model_registry.py
+import importlib
+import os
+import threading
+import time
+
+from .metrics import span
+
+
+# Detectors shared by the image, AR and voice pipelines. Factories are given as
+# "module:attribute" strings so that registering them does not import torch,
+# ultralytics, easyocr or whisper until a model is actually requested.
+DEFAULT_FACTORIES = {
+    'deepfake': 'deepfake_detector_core.inference:PhishingClassifier',
+    'yolo': 'ar_phishing_detector.yolo_ui_detector:YOLODetector',
+    'ocr': 'ar_phishing_detector.ocr_analysis:OCRAnalyzer',
+    'transcriber': 'voice_phishing_detector.transcriber:AudioTranscriber',
+    'nlp': 'voice_phishing_detector.phishing_nlp:PhishingNLPDetector',
+}
+
+
+def _resolve_factory(factory):
+    if callable(factory):
+        return factory
+    module_name, _, attr = factory.partition(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _make_key(name, kwargs):
+    return (name, tuple(sorted(kwargs.items())))
+
+
+def _describe_factory(factory):
+    if isinstance(factory, str):
+        return factory
+    return f"{getattr(factory, '__module__', '')}:{getattr(factory, '__qualname__', repr(factory))}"
+
+
+def _describe_value(value):
+    # A file argument (keyword list, blocklist, checkpoint) is stamped with its
+    # size and modification time, so editing the file changes the description
+    if isinstance(value, (str, os.PathLike)) and os.path.isfile(value):
+        stat = os.stat(value)
+        return f"{os.fspath(value)}@{stat.st_size}:{stat.st_mtime_ns}"
+    return repr(value)
+
+
+class ModelRegistry:
+    """Thread-safe, lazily populated store of loaded models.
+
+    Each (name, kwargs) pair is loaded at most once per process. Concurrent
+    callers asking for the same model wait for the first load to finish instead
+    of loading their own copy.
+    """
+
+    def __init__(self, factories=None):
+        self._factories = dict(factories or {})
+        self._defaults = {}
+        self._instances = {}
+        self._load_times = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory=None, **defaults):
+        """
+        Register a factory (callable or "module:attribute" string) under a name.
+
+        defaults are keyword arguments passed to the factory on every load, so a
+        model can be reconfigured (e.g. register('ocr', mode='roi')) without
+        importing it. factory=None keeps the current factory for name. Instances
+        already loaded under name are dropped, as they were built by the old settings.
+        """
+        with self._lock:
+            if factory is None:
+                factory = self._factories[name]
+            self._factories[name] = factory
+            self._defaults[name] = defaults
+            for key in [key for key in self._instances if key[0] == name]:
+                del self._instances[key]
+                self._load_times.pop(key, None)
+
+    def get(self, name, **kwargs):
+        """Return the model registered under name, loading it on first use."""
+        key = _make_key(name, kwargs)
+        with self._lock:
+            if key in self._instances:
+                return self._instances[key]
+            if name not in self._factories:
+                raise KeyError(f"No model registered under '{name}'")
+            factory = self._factories[name]
+            defaults = self._defaults.get(name, {})
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._instances:
+                    return self._instances[key]
+            start = time.perf_counter()
+            with span(f'model_load.{name}'):
+                instance = _resolve_factory(factory)(**{**defaults, **kwargs})
+            with self._lock:
+                self._instances[key] = instance
+                self._load_times[key] = time.perf_counter() - start
+            return instance
+
+    def settings_key(self, name):
+        """
+        Describe how name would be built (its factory and registered defaults)
+        without loading it, e.g. to version cached results of that model.
+        """
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"No model registered under '{name}'")
+            factory = self._factories[name]
+            defaults = dict(self._defaults.get(name, {}))
+        settings = ",".join(f"{key}={_describe_value(value)}" for key, value in sorted(defaults.items()))
+        return f"{_describe_factory(factory)}({settings})"
+
+    def is_loaded(self, name, **kwargs):
+        with self._lock:
+            return _make_key(name, kwargs) in self._instances
+
+    def loaded(self):
+        """List the models currently resident, as (name, kwargs) pairs."""
+        with self._lock:
+            return [(name, dict(kwargs)) for name, kwargs in self._instances]
+
+    def unload(self, name=None):
+        """Drop loaded instances of one model, or of every model if name is None."""
+        with self._lock:
+            for key in list(self._instances):
+                if name is None or key[0] == name:
+                    del self._instances[key]
+                    self._load_times.pop(key, None)
+                    self._key_locks.pop(key, None)
+
+    def load_report(self):
+        """List (name, kwargs, seconds) for each resident model: how long its first load took."""
+        with self._lock:
+            return [(name, dict(kwargs), self._load_times[(name, kwargs)]) for name, kwargs in self._instances]
+
+    def warm_up(self, names=None, on_loaded=None):
+        """
+        Load models in a background daemon thread and return the thread.
+
+        names defaults to every registered model. Requests made while warm-up is
+        running wait for that model's load instead of starting a second one.
+        on_loaded(name, error) is called after each model, with error None on success.
+        """
+        with self._lock:
+            names = list(names if names is not None else self._factories)
+
+        def run():
+            for name in names:
+                error = None
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Error warming up model {name}: {str(e)}")
+                    error = e
+                if on_loaded is not None:
+                    on_loaded(name, error)
+
+        thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+
+registry = ModelRegistry(DEFAULT_FACTORIES)
+
+
+def get_model(name, **kwargs):
+    """Shortcut for registry.get on the process-wide registry."""
+    return registry.get(name, **kwargs)
@@ -0,0 +1,120 @@
+# deepfake_detector_core/quantization.py
+import contextlib
+import glob
+import json
+import os
+
+PRECISIONS = ('fp32', 'int8', 'bf16')
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+
+
+def bf16_supported():
+    """True if this CPU has native bfloat16 support (AVX512-BF16 or AMX)."""
+    import torch
+
+    check = getattr(torch.cpu, '_is_avx512_bf16_supported', None)
+    try:
+        return bool(check and check())
+    except Exception:
+        return False
+
+
+def check_precision(precision):
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+    return precision
+
+
+def quantize_model(model, precision):
+    """
+    Prepare a model for CPU inference at the given precision.
+
+    'int8' applies dynamic INT8 quantisation to the nn.Linear layers (all of
+    DistilBERT's encoder; only the classifier head of Xception/EfficientNet,
+    whose convolutions stay in FP32). 'fp32' and 'bf16' return the model
+    unchanged; bf16 is applied at call time through inference_context.
+    """
+    check_precision(precision)
+    if precision == 'int8':
+        import torch
+
+        model = torch.ao.quantization.quantize_dynamic(model.cpu(), {torch.nn.Linear}, dtype=torch.qint8)
+        model.eval()
+    return model
+
+
+def inference_context(precision):
+    """Context for a forward pass: bf16 CPU autocast when requested and supported."""
+    if precision == 'bf16' and bf16_supported():
+        import torch
+
+        return torch.autocast('cpu', dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+
+def _image_samples(data_dir):
+    paths = []
+    for folder in ('sample_images', 'ar_screenshots'):
+        for ext in ('*.png', '*.jpg', '*.jpeg'):
+            paths.extend(glob.glob(os.path.join(data_dir, folder, ext)))
+    return sorted(paths)
+
+
+def _drift(reference, candidate, threshold):
+    diffs = [abs(a - b) for a, b in zip(reference, candidate)]
+    agree = sum((a > threshold) == (b > threshold) for a, b in zip(reference, candidate))
+    return {
+        'samples': len(diffs),
+        'max_abs_diff': max(diffs, default=0.0),
+        'mean_abs_diff': sum(diffs) / len(diffs) if diffs else 0.0,
+        'verdict_agreement': agree / len(diffs) if diffs else 1.0
+    }
+
+
+def check_accuracy_drift(precision='int8', data_dir=DATA_DIR, texts=None):
+    """
+    Compare a reduced-precision mode against FP32 on the bundled samples.
+
+    Xception scores are compared on data/sample_images and data/ar_screenshots.
+    DistilBERT scores are compared on texts, or on Whisper transcripts of
+    data/voice_clips when texts is None. Reports max/mean absolute score
+    difference and the fraction of samples whose verdict (score > 0.5) agrees.
+    """
+    from .inference import PhishingClassifier
+    from voice_phishing_detector.phishing_nlp import PhishingNLPDetector
+
+    check_precision(precision)
+    report = {'precision': precision, 'bf16_supported': bf16_supported()}
+
+    images = _image_samples(data_dir)
+    scores = {}
+    for mode in ('fp32', precision):
+        classifier = PhishingClassifier(precision=mode)
+        tensors = [classifier.preprocess_image(path) for path in images]
+        scores[mode] = [classifier._dl_scores(t)[0] for t in tensors if t is not None]
+    report['xception'] = _drift(scores['fp32'], scores[precision], 0.5)
+
+    if texts is None:
+        from voice_phishing_detector.transcriber import AudioTranscriber
+        transcriber = AudioTranscriber()
+        clips = sorted(glob.glob(os.path.join(data_dir, 'voice_clips', '*')))
+        texts = [transcriber.transcribe_audio(clip)['text'] for clip in clips]
+    texts = [text.lower() for text in texts if text]
+
+    scores = {}
+    for mode in ('fp32', precision):
+        scores[mode] = PhishingNLPDetector(precision=mode)._window_scores(texts) if texts else []
+    report['distilbert'] = _drift(scores['fp32'], scores[precision], 0.5)
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check accuracy drift of a reduced-precision mode against FP32")
+    parser.add_argument("--precision", default="int8", choices=PRECISIONS)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args()
+    print(json.dumps(check_accuracy_drift(args.precision, args.data_dir), indent=2))
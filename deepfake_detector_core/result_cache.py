@@ -0,0 +1,161 @@
+# deepfake_detector_core/result_cache.py
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def content_digest(source):
+    """
+    SHA-256 of an input's content: a file path (streamed), raw bytes, text or ndarray.
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, np.ndarray):
+        digest.update(f"{source.dtype}{source.shape}".encode())
+        digest.update(np.ascontiguousarray(source).tobytes())
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    elif isinstance(source, os.PathLike) or (isinstance(source, str) and os.path.isfile(source)):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    elif isinstance(source, str):
+        digest.update(source.encode('utf-8'))
+    else:
+        raise TypeError(f"Cannot hash input of type {type(source).__name__}")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache for pipeline results.
+
+    Keys combine the operation, a model/config version string and the SHA-256 of
+    the input, so a changed model or setting never returns a stale result.
+    Results are stored pickled: the in-memory tier is an LRU bounded by total
+    pickled size (max_bytes), and an optional SQLite file (disk_path) keeps them
+    across restarts. Entries found on disk are promoted into memory.
+
+    The SQLite file may be shared by several worker processes: it runs in WAL
+    mode and waits up to busy_timeout seconds for a lock. A database error is
+    treated as a miss on read and skips the write, so results are still returned.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_path=None, busy_timeout=5.0):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if disk_path:
+            try:
+                self._db = sqlite3.connect(disk_path, timeout=busy_timeout, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Error opening result cache database, caching in memory only: {str(e)}")
+                self._db = None
+
+    @staticmethod
+    def make_key(operation, version, source):
+        return f"{operation}:{version}:{content_digest(source)}"
+
+    def _store_memory(self, key, blob):
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        if len(blob) > self.max_bytes:
+            return
+        self._entries[key] = blob
+        self._size += len(blob)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def get(self, key, default=None):
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pickle.loads(blob)
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    print(f"Error reading result cache database: {str(e)}")
+                    row = None
+                if row is not None:
+                    self._store_memory(key, row[0])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return pickle.loads(row[0])
+
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store_memory(key, blob)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, blob))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Error writing result cache database, entry kept in memory only: {str(e)}")
+                    self._db.rollback()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result for key, or compute and store it.
+        Results carrying an 'error' are returned but never cached.
+        """
+        result = self.get(key)
+        if result is not None:
+            return result
+        result = compute()
+        if not (isinstance(result, dict) and result.get('error')):
+            self.put(key, result)
+        return result
+
+    def cached_call(self, operation, version, source, compute):
+        """
+        get_or_compute keyed on the content of source. Inputs that cannot be
+        hashed (missing file, unsupported type) bypass the cache so compute()
+        can report the error itself.
+        """
+        try:
+            key = self.make_key(operation, version, source)
+        except (OSError, TypeError):
+            return compute()
+        return self.get_or_compute(key, compute)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
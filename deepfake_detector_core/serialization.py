@@ -0,0 +1,8 @@
+# deepfake_detector_core/serialization.py
+
+
+def json_default(value):
+    """json.dumps default= hook for result dicts: numpy scalars/arrays in OCR boxes and detections."""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
@@ -0,0 +1,176 @@
+# deepfake_detector_core/video_pipeline.py
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from ar_phishing_detector.frame_dedup import FrameDeduplicator
+from ar_phishing_detector.ui_analyzer import iter_frames, score_ui_anomalies
+from .inference import VideoScoreAggregator
+from .metrics import in_current_context, span
+from .model_registry import get_model
+
+_END = object()
+
+
+class VideoPipeline:
+    """
+    Pipelined video classification.
+
+    A decoder thread reads and deduplicates frames into a bounded queue. Frames
+    are grouped into batches; for each batch YOLO runs once on all frames while
+    OCR runs frame by frame in its own pool, and Xception then scores the frames
+    the UI analysis flagged, as one batch, in the scoring pool. Up to
+    max_inflight_batches batches are processed at once, so decode, detection and
+    OCR overlap.
+
+    YOLO runs on a single dedicated thread: the registry shares one
+    YOLODetector per process, which serialises its model calls, so extra
+    detection threads would only queue behind each other. Batches still overlap
+    with it through OCR and Xception.
+
+    The bounded queue and the in-flight limit keep memory flat on long videos.
+    Results are aggregated in frame order exactly as in
+    PhishingClassifier.classify_video.
+    """
+
+    def __init__(self, classifier, batch_size=8, score_workers=1, ocr_workers=None,
+                 max_inflight_batches=3, queue_size=32, frame_rate=15, max_frames=100,
+                 dedup=True, max_hash_distance=4):
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self.score_workers = score_workers
+        self.ocr_workers = ocr_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_inflight_batches = max_inflight_batches
+        self.queue_size = queue_size
+        self.frame_rate = frame_rate
+        self.max_frames = max_frames
+        self.dedup = dedup
+        self.max_hash_distance = max_hash_distance
+
+    def _decode(self, video_path, frames, stop, errors):
+        """Decoder stage: push (index, frame, reused) items, then _END."""
+        try:
+            deduplicator = FrameDeduplicator(self.max_hash_distance) if self.dedup else None
+            for index, frame in iter_frames(video_path, self.frame_rate, self.max_frames):
+                with span('video.dedup'):
+                    reused = deduplicator is not None and deduplicator.is_duplicate(frame)
+                # Reused frames only need their index downstream
+                item = (index, None if reused else frame, reused)
+                if not self._put(frames, item, stop):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            self._put(frames, _END, stop)
+
+    @staticmethod
+    def _put(frames, item, stop):
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _batches(self, frames):
+        batch = []
+        while True:
+            item = frames.get()
+            if item is _END:
+                break
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _process_batch(self, batch, yolo, ocr, yolo_pool, ocr_pool, score_pool):
+        """
+        Run YOLO, OCR and Xception for one batch.
+        Returns (index, ui_result, dl_score, reused) records in frame order.
+        """
+        analysed = [(index, frame) for index, frame, reused in batch if not reused]
+        frames = [frame for _, frame in analysed]
+
+        ui_results = {}
+        if frames:
+            yolo_future = yolo_pool.submit(in_current_context(yolo.detect_ui_elements_batch), frames)
+            ocr_futures = [ocr_pool.submit(in_current_context(ocr.extract_text), frame) for frame in frames]
+            detections = yolo_future.result()
+            for (index, _), ui_elements, ocr_future in zip(analysed, detections, ocr_futures):
+                text, ocr_results = ocr_future.result()
+                ui_results[index] = score_ui_anomalies(ui_elements, text, ocr_results, ocr)
+
+        # Xception only on frames the UI analysis flagged, as classify_video does
+        dl_scores = {}
+        flagged = [(index, frame) for index, frame in analysed if ui_results[index]['is_phishing']]
+        if flagged:
+            dl_scores = score_pool.submit(in_current_context(self._score_frames), flagged).result()
+
+        return [
+            (index, ui_results.get(index), dl_scores.get(index), reused)
+            for index, _, reused in batch
+        ]
+
+    def _score_frames(self, flagged):
+        tensors = {}
+        for index, frame in flagged:
+            input_tensor = self.classifier.preprocess_image(frame)
+            if input_tensor is not None:
+                tensors[index] = input_tensor
+        if not tensors:
+            return {}
+        scores = self.classifier._dl_scores(torch.cat(list(tensors.values())))
+        return dict(zip(tensors, scores))
+
+    def run(self, video_path):
+        """Classify a video; returns the same result dict as classify_video."""
+        yolo = get_model('yolo')
+        ocr = get_model('ocr')
+
+        frames = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors = []
+        decoder = threading.Thread(target=in_current_context(self._decode), args=(video_path, frames, stop, errors),
+                                   name="video-decoder", daemon=True)
+        decoder.start()
+
+        aggregator = VideoScoreAggregator()
+        last_result = None
+
+        def collect(records):
+            nonlocal last_result
+            for index, ui_result, dl_score, reused in records:
+                if reused:
+                    aggregator.add(index, last_result, reused=True)
+                else:
+                    last_result = ui_result
+                    aggregator.add(index, ui_result, dl_score)
+
+        try:
+            with ThreadPoolExecutor(1, thread_name_prefix="video-yolo") as yolo_pool, \
+                    ThreadPoolExecutor(self.ocr_workers, thread_name_prefix="video-ocr") as ocr_pool, \
+                    ThreadPoolExecutor(self.score_workers, thread_name_prefix="video-score") as score_pool, \
+                    ThreadPoolExecutor(self.max_inflight_batches, thread_name_prefix="video-batch") as batch_pool:
+                pending = deque()
+                for batch in self._batches(frames):
+                    pending.append(batch_pool.submit(
+                        in_current_context(self._process_batch), batch, yolo, ocr, yolo_pool, ocr_pool, score_pool))
+                    # Backpressure: stop pulling frames while too many batches are in flight
+                    while len(pending) >= self.max_inflight_batches:
+                        collect(pending.popleft().result())
+                while pending:
+                    collect(pending.popleft().result())
+        finally:
+            stop.set()
+            decoder.join()
+
+        if errors:
+            raise errors[0]
+        return aggregator.result()
@@ -1,41 +1,212 @@
 # main.py
-from deepfake_detector_core.inference import load_model, preprocess_image, classify_image
-from ar_phishing_detector.ocr_analysis import extract_text, detect_suspicious_keywords, detect_suspicious_urls
-from ar_phishing_detector.yolo_ui_detector import detect_ui_elements
-from voice_phishing_detector.transcriber import transcribe_audio
-from voice_phishing_detector.phishing_nlp import detect_phishing_nlp
+"""
+Bulk scanner: route images, videos and audio files to the matching pipeline
+across a process pool and stream one JSON result per line as files finish.
+
+    python main.py data/ --workers 4 --output results.jsonl
+    python main.py --manifest reports.jsonl
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from deepfake_detector_core.serialization import json_default
+
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+VIDEO_EXTS = {'.mp4', '.mov', '.avi', '.mkv', '.webm'}
+AUDIO_EXTS = {'.mp3', '.wav', '.m4a', '.ogg', '.flac'}
+
+# Per-worker settings, filled in by _init_worker
+_options = {}
+
+
+def media_type(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in IMAGE_EXTS:
+        return 'image'
+    if ext in VIDEO_EXTS:
+        return 'video'
+    if ext in AUDIO_EXTS:
+        return 'audio'
+    return None
+
+
+def iter_manifest(manifest_path):
+    """
+    Yield (id, path) from a JSONL manifest. Each line is an object with a 'path'
+    (or 'file') and an optional 'request_id' or 'id'; relative paths are resolved
+    against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            path = entry.get('path') or entry.get('file')
+            if not path:
+                print(f"Skipping manifest line {line_no}: no 'path'", file=sys.stderr)
+                continue
+            item_id = entry.get('request_id') or entry.get('id') or path
+            yield item_id, path if os.path.isabs(path) else os.path.join(base, path)
+
+
+def iter_inputs(paths, manifest=None):
+    """Yield (id, path) for every file under paths, then every manifest entry."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    file_path = os.path.join(root, name)
+                    yield file_path, file_path
+        else:
+            yield path, path
+    if manifest:
+        yield from iter_manifest(manifest)
 
-if __name__ == "__main__":
-    model = load_model()
-    image_path = "data/sample_images/sample1.jpg"  # your image
-    input_tensor = preprocess_image(image_path)
-    label, confidence = classify_image(model, input_tensor)
 
-    print(f"Prediction: {label} ({confidence}%)")
+def _init_worker(options):
+    """Runs once per worker process; models are then loaded lazily, once per worker."""
+    import torch
+    from deepfake_detector_core.model_registry import registry
 
+    _options.update(options)
+    torch.set_num_threads(options['threads_per_worker'])
+    # The UI analysis fetches YOLO and OCR from the registry, so reconfigure their defaults
+    if options['backend'] != 'torch':
+        registry.register('yolo', backend=options['backend'])
+    if options['ocr_mode'] != 'full':
+        registry.register('ocr', mode=options['ocr_mode'])
 
-image_path = "data/ar_screenshots/ar_sample1.jpg"
 
-# OCR Analysis
-text, raw_ocr = extract_text(image_path)
-keywords = detect_suspicious_keywords(text)
-urls = detect_suspicious_urls(text)
+def _model(name, **kwargs):
+    from deepfake_detector_core.model_registry import get_model
 
-# YOLOv8 UI Detection
-ui_detections = detect_ui_elements(image_path)
+    if _options.get('cache_path'):
+        kwargs['cache'] = _worker_cache()
+    return get_model(name, **kwargs)
 
-print("\n[OCR TEXT]:", text)
-print("[Suspicious Keywords]:", keywords)
-print("[Suspicious URLs]:", urls)
-print("[YOLO UI Alerts]:", ui_detections)
 
-audio_path = "data/voice_clips/phish_sample1.mp3"
+def _worker_cache():
+    from deepfake_detector_core.result_cache import ResultCache
 
-# Step 1: Transcribe audio
-transcript = transcribe_audio(audio_path)
-print("\n[Transcript]:", transcript)
+    if 'cache' not in _options:
+        _options['cache'] = ResultCache(disk_path=_options['cache_path'])
+    return _options['cache']
 
-# Step 2: Phishing Detection
-label, suspicious_phrases, raw_nlp = detect_phishing_nlp(transcript)
-print(f"[Prediction]: {label}")
-print(f"[Suspicious Phrases]: {suspicious_phrases}")
+
+def scan_file(item_id, path):
+    """Run the pipeline for one file and return a JSON-ready record."""
+    kind = media_type(path)
+    record = {'id': item_id, 'path': path, 'type': kind}
+    start = time.perf_counter()
+    try:
+        if kind == 'image':
+            classifier = _model('deepfake', precision=_options['precision'], backend=_options['backend'],
+                                cascade=_options['cascade'])
+            record['result'] = classifier.classify_image(path)
+        elif kind == 'video':
+            classifier = _model('deepfake', precision=_options['precision'], backend=_options['backend'],
+                                cascade=_options['cascade'])
+            record['result'] = classifier.classify_video(path, pipelined=_options['pipelined_video'])
+        elif kind == 'audio':
+            transcript = _model('transcriber').transcribe_audio(path)
+            record['transcript'] = transcript
+            if transcript['error']:
+                record['error'] = transcript['error']
+            else:
+                nlp = _model('nlp', precision=_options['precision'], backend=_options['backend'])
+                record['result'] = nlp.detect_phishing_nlp(transcript['text'])
+        else:
+            record['error'] = 'Unsupported file type'
+    except Exception as e:
+        record['error'] = str(e)
+    record['elapsed_s'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def run(args):
+    workers = args.workers or os.cpu_count() or 1
+    if args.timings:
+        # Spawned workers inherit the environment and enable metrics on import
+        os.environ['AURA_GUARD_METRICS'] = '1'
+    options = {
+        'threads_per_worker': max(1, (os.cpu_count() or 1) // workers),
+        'precision': args.precision,
+        'backend': args.backend,
+        'pipelined_video': args.pipelined_video,
+        'cache_path': args.cache,
+        'ocr_mode': args.ocr_mode,
+        'cascade': tuple(args.cascade) if args.cascade else None,
+    }
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    inputs = (
+        (item_id, path) for item_id, path in iter_inputs(args.paths, args.manifest)
+        if args.all_files or media_type(path)
+    )
+
+    scanned = 0
+    try:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(options,)) as executor:
+            pending = set()
+            # Keep a bounded number of files in flight so memory stays flat on huge corpora
+            max_pending = workers * 2
+            for item_id, path in inputs:
+                pending.add(executor.submit(scan_file, item_id, path))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    scanned += _write(done, out)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                scanned += _write(done, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Scanned {scanned} files", file=sys.stderr)
+
+
+def _write(done, out):
+    for future in done:
+        out.write(json.dumps(future.result(), default=json_default) + "\n")
+    out.flush()
+    return len(done)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scan images, videos and audio for phishing and deepfakes")
+    parser.add_argument("paths", nargs="*", help="Files or directories to scan (walked recursively)")
+    parser.add_argument("--manifest", help="JSONL manifest with one {'path': ..., 'request_id': ...} per line")
+    parser.add_argument("--output", "-o", help="Write JSONL results here instead of stdout")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--precision", default="fp32", choices=["fp32", "int8", "bf16"],
+                        help="CPU inference mode. int8 mainly speeds up the NLP model: for Xception it "
+                             "only quantises the classifier head, and it is ignored on CUDA")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx"])
+    parser.add_argument("--ocr-mode", default="full", choices=["full", "roi", "tiled"],
+                        help="'roi' detects text on a downscaled image and recognises only text regions; "
+                             "'tiled' reads large images as overlapping tiles in parallel")
+    parser.add_argument("--cascade", nargs=3, metavar="STAGE", choices=["ocr", "xception", "yolo"],
+                        help="Classify images through an early-exit cascade in this stage order, "
+                             "e.g. --cascade ocr xception yolo")
+    parser.add_argument("--pipelined-video", action="store_true", help="Use the pipelined video engine")
+    parser.add_argument("--cache", help="SQLite file for the shared result cache")
+    parser.add_argument("--timings", action="store_true",
+                        help="Add a per-stage 'timings' breakdown (ms) to every result")
+    parser.add_argument("--all-files", action="store_true",
+                        help="Also emit records for files with unsupported extensions")
+    args = parser.parse_args(argv)
+    if not args.paths and not args.manifest:
+        parser.error("give at least one path or --manifest")
+    if args.cascade and len(set(args.cascade)) != len(args.cascade):
+        parser.error("--cascade must name each of ocr, xception and yolo once")
+    return args
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,300 @@
+# service/server.py
+"""
+Asynchronous local inference service.
+
+    python service/server.py --port 8080
+
+Endpoints (request bodies are the raw file bytes, or a multipart form with a
+'file' field):
+
+    POST /v1/image            classify an image, answered inline
+    POST /v1/video            queue a video job, answers 202 with a job id
+    POST /v1/audio            queue a transcribe + NLP job, answers 202 with a job id
+    GET  /v1/jobs/{job_id}    job status and, once done, its result
+    GET  /healthz             loaded models and queue depth
+    GET  /metrics             per-stage histograms in Prometheus text format
+
+Add ?wait=1 to the video or audio endpoints to get the result inline instead
+of a job id. Each model runs on its own executor, so a slow video never holds
+up image or audio requests. Concurrent image requests share Xception forward
+passes through a MicroBatcher, and concurrent audio requests share DistilBERT
+batches. Each kind of request has a bounded number of pending requests; beyond
+it the service answers 429 with a Retry-After header instead of queueing
+without limit.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from deepfake_detector_core.batching import MicroBatcher  # noqa: E402
+from deepfake_detector_core.metrics import stage_metrics  # noqa: E402
+from deepfake_detector_core.model_registry import get_model, registry  # noqa: E402
+from deepfake_detector_core.serialization import json_default  # noqa: E402
+
+VIDEO_SUFFIXES = {'.mp4', '.mov', '.avi', '.mkv', '.webm'}
+
+
+def json_response(data, status=200, headers=None):
+    return web.json_response(data, status=status, headers=headers,
+                             dumps=lambda obj: json.dumps(obj, default=json_default))
+
+
+class Admission:
+    """Non-blocking cap on the number of pending requests of one kind."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.pending = 0
+
+    def try_acquire(self):
+        # Only touched from the event loop thread, so no lock is needed
+        if self.pending >= self.limit:
+            return False
+        self.pending += 1
+        return True
+
+    def release(self):
+        self.pending -= 1
+
+
+class InferenceService:
+    def __init__(self, max_pending=None, image_batch_size=8, text_batch_size=16, max_wait_ms=10.0,
+                 video_workers=1, audio_workers=1, job_ttl=3600.0):
+        limits = {'image': 64, 'video': 4, 'audio': 16}
+        limits.update(max_pending or {})
+        self.admission = {kind: Admission(limit) for kind, limit in limits.items()}
+        self.image_batch_size = image_batch_size
+        self.text_batch_size = text_batch_size
+        self.max_wait_ms = max_wait_ms
+        # One executor per model family; image inference runs on the MicroBatcher thread
+        self.executors = {
+            'video': ThreadPoolExecutor(video_workers, thread_name_prefix="service-video"),
+            'audio': ThreadPoolExecutor(audio_workers, thread_name_prefix="service-audio"),
+            'io': ThreadPoolExecutor(2, thread_name_prefix="service-io"),
+        }
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        self.image_batcher = None
+        self.text_batcher = None
+
+    async def start(self, app):
+        """Load the models off the event loop before accepting requests."""
+        loop = asyncio.get_running_loop()
+        models = await loop.run_in_executor(
+            self.executors['io'],
+            lambda: {name: get_model(name) for name in ('deepfake', 'yolo', 'ocr', 'transcriber', 'nlp')}
+        )
+        self.image_batcher = models['deepfake'].micro_batcher(self.image_batch_size, self.max_wait_ms)
+        self.text_batcher = MicroBatcher(
+            lambda texts: models['nlp'].detect_phishing_batch(texts, batch_size=self.text_batch_size),
+            max_batch_size=self.text_batch_size,
+            max_wait_ms=self.max_wait_ms
+        )
+
+    async def stop(self, app):
+        for batcher in (self.image_batcher, self.text_batcher):
+            if batcher is not None:
+                batcher.close()
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def routes(self):
+        return [
+            web.post('/v1/image', self.handle_image),
+            web.post('/v1/video', self.handle_video),
+            web.post('/v1/audio', self.handle_audio),
+            web.get('/v1/jobs/{job_id}', self.handle_job),
+            web.get('/healthz', self.handle_health),
+            web.get('/metrics', self.handle_metrics),
+        ]
+
+    # Request helpers
+
+    @staticmethod
+    async def _read_upload(request):
+        """Return (bytes, filename) from a raw body or a multipart 'file' field."""
+        if request.content_type.startswith('multipart/'):
+            reader = await request.multipart()
+            async for part in reader:
+                if part.name == 'file':
+                    return await part.read(), part.filename or ''
+            raise web.HTTPBadRequest(text="multipart body has no 'file' field")
+        return await request.read(), request.query.get('filename', '')
+
+    def _busy(self, kind):
+        return json_response(
+            {'error': f"Too many pending {kind} requests, retry later"}, status=429, headers={'Retry-After': '1'}
+        )
+
+    # Jobs
+
+    def _expire_jobs(self):
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job['finished'] is not None and job['finished'] < cutoff]:
+            del self.jobs[job_id]
+
+    def _start_job(self, kind, coro):
+        self._expire_jobs()
+        job_id = uuid.uuid4().hex
+        job = {'id': job_id, 'kind': kind, 'status': 'queued', 'created': time.time(),
+               'finished': None, 'result': None}
+        self.jobs[job_id] = job
+
+        async def run():
+            job['status'] = 'running'
+            try:
+                job['result'] = await coro
+                job['status'] = 'failed' if job['result'].get('error') else 'done'
+            except Exception as e:
+                job['result'] = {'error': str(e)}
+                job['status'] = 'failed'
+            finally:
+                job['finished'] = time.time()
+
+        job['task'] = asyncio.get_running_loop().create_task(run())
+        return job
+
+    @staticmethod
+    def _job_view(job):
+        return {key: value for key, value in job.items() if key != 'task'}
+
+    # Pipelines
+
+    async def _classify_image(self, data, filename):
+        # A disconnected client cancels this await, which cancels the batcher's Future:
+        # still queued, the image is skipped; already in a batch, it finishes unobserved
+        return await asyncio.wrap_future(self.image_batcher.submit(data))
+
+    async def _classify_video(self, data, filename):
+        loop = asyncio.get_running_loop()
+        suffix = os.path.splitext(filename)[1].lower()
+        # classify_video reads from a path; the upload is spooled to a private temp file
+        fd, path = tempfile.mkstemp(suffix=suffix if suffix in VIDEO_SUFFIXES else '.mp4')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                await loop.run_in_executor(self.executors['io'], f.write, data)
+            return await loop.run_in_executor(
+                self.executors['video'], lambda: get_model('deepfake').classify_video(path, pipelined=True)
+            )
+        finally:
+            os.remove(path)
+
+    async def _analyze_audio(self, data, filename):
+        loop = asyncio.get_running_loop()
+        transcript = await loop.run_in_executor(
+            self.executors['audio'], get_model('transcriber').transcribe_audio, data
+        )
+        if transcript['error']:
+            return {'transcript': transcript, 'error': transcript['error']}
+        result = await asyncio.wrap_future(self.text_batcher.submit(transcript['text']))
+        return {'transcript': transcript, 'result': result, 'error': result.get('error')}
+
+    async def _handle(self, kind, request, pipeline, as_job=False):
+        """
+        Admit a request, read its upload and run pipeline(data, filename), inline or
+        as a background job. The admission slot is held until the pipeline finishes.
+        """
+        admission = self.admission[kind]
+        if not admission.try_acquire():
+            return self._busy(kind)
+
+        try:
+            data, filename = await self._read_upload(request)
+            if not data:
+                admission.release()
+                return json_response({'error': 'Empty upload'}, status=400)
+        except Exception:
+            admission.release()
+            raise
+
+        async def run():
+            try:
+                return await pipeline(data, filename)
+            finally:
+                admission.release()
+
+        if as_job and request.query.get('wait') not in ('1', 'true'):
+            job = self._start_job(kind, run())
+            return json_response(self._job_view(job), status=202,
+                                 headers={'Location': f"/v1/jobs/{job['id']}"})
+        result = await run()
+        return json_response(result, status=500 if result.get('error') else 200)
+
+    # Handlers
+
+    async def handle_image(self, request):
+        return await self._handle('image', request, self._classify_image)
+
+    async def handle_video(self, request):
+        return await self._handle('video', request, self._classify_video, as_job=True)
+
+    async def handle_audio(self, request):
+        return await self._handle('audio', request, self._analyze_audio, as_job=True)
+
+    async def handle_job(self, request):
+        job = self.jobs.get(request.match_info['job_id'])
+        if job is None:
+            return json_response({'error': 'Unknown job id'}, status=404)
+        return json_response(self._job_view(job))
+
+    async def handle_health(self, request):
+        return json_response({
+            'status': 'ok' if self.image_batcher is not None else 'loading',
+            'models': [name for name, _ in registry.loaded()],
+            'pending': {kind: admission.pending for kind, admission in self.admission.items()},
+            'jobs': len(self.jobs)
+        })
+
+    async def handle_metrics(self, request):
+        return web.Response(text=stage_metrics.to_prometheus(), content_type='text/plain', charset='utf-8')
+
+
+SERVICE_KEY = web.AppKey('service', InferenceService)
+
+
+def create_app(service=None, max_upload_mb=512):
+    service = service or InferenceService()
+    app = web.Application(client_max_size=max_upload_mb * 1024 * 1024)
+    app.add_routes(service.routes())
+    app.on_startup.append(service.start)
+    app.on_cleanup.append(service.stop)
+    app[SERVICE_KEY] = service
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the AURA-GUARD pipelines over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-pending-images", type=int, default=64)
+    parser.add_argument("--max-pending-videos", type=int, default=4)
+    parser.add_argument("--max-pending-audio", type=int, default=16)
+    parser.add_argument("--batch-wait-ms", type=float, default=10.0,
+                        help="How long a batch waits for more concurrent requests")
+    parser.add_argument("--video-workers", type=int, default=1)
+    parser.add_argument("--audio-workers", type=int, default=1)
+    parser.add_argument("--max-upload-mb", type=int, default=512)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    service = InferenceService(
+        max_pending={'image': args.max_pending_images, 'video': args.max_pending_videos,
+                     'audio': args.max_pending_audio},
+        max_wait_ms=args.batch_wait_ms,
+        video_workers=args.video_workers,
+        audio_workers=args.audio_workers
+    )
+    web.run_app(create_app(service, args.max_upload_mb), host=args.host, port=args.port)
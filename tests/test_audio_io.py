@@ -0,0 +1,61 @@
+# tests/test_audio_io.py
+import os
+import subprocess
+
+import numpy as np
+import pytest
+
+from voice_phishing_detector import audio_io
+
+PCM = np.array([0, 16384, -16384], dtype='<i2').tobytes()
+
+
+class FakeFFmpeg:
+    """Stands in for subprocess.run, recording what ffmpeg was asked to read."""
+
+    def __init__(self, fail_on_pipe=False):
+        self.fail_on_pipe = fail_on_pipe
+        self.inputs = []
+
+    def __call__(self, cmd, input=None, capture_output=True, check=True):
+        source = cmd[cmd.index('-i') + 1]
+        self.inputs.append(source)
+        if source == 'pipe:0':
+            if self.fail_on_pipe:
+                raise subprocess.CalledProcessError(1, cmd, stderr=b'moov atom not found')
+        else:
+            assert os.path.exists(source)
+        return subprocess.CompletedProcess(cmd, 0, stdout=PCM)
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch):
+    fake = FakeFFmpeg()
+    monkeypatch.setattr(audio_io.subprocess, 'run', fake)
+    return fake
+
+
+def test_plain_bytes_are_piped(ffmpeg):
+    audio = audio_io.decode_audio(b'ID3' + b'\0' * 32)
+    assert ffmpeg.inputs == ['pipe:0']
+    assert np.allclose(audio, [0.0, 0.5, -0.5])
+
+
+def test_mp4_containers_are_decoded_from_a_temporary_file(ffmpeg):
+    m4a = b'\0\0\0\x20ftypM4A ' + b'\0' * 32
+    audio_io.decode_audio(m4a)
+    assert len(ffmpeg.inputs) == 1 and ffmpeg.inputs[0] != 'pipe:0'
+    assert not os.path.exists(ffmpeg.inputs[0])
+
+
+def test_pipe_failure_retries_from_a_temporary_file(ffmpeg):
+    ffmpeg.fail_on_pipe = True
+    audio = audio_io.decode_audio(b'\0' * 64)
+    assert ffmpeg.inputs[0] == 'pipe:0' and ffmpeg.inputs[1] != 'pipe:0'
+    assert not os.path.exists(ffmpeg.inputs[1])
+    assert len(audio) == 3
+
+
+def test_arrays_are_returned_as_float32():
+    audio = audio_io.decode_audio(np.zeros(4, dtype=np.float64))
+    assert audio.dtype == np.float32
@@ -0,0 +1,78 @@
+# tests/test_batching.py
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from deepfake_detector_core.batching import MicroBatcher
+
+
+class GatedDouble:
+    """batch_fn that blocks until released, recording every batch it receives."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+
+    def __call__(self, items):
+        self.release.wait(5)
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+def test_batches_concurrent_items_in_order():
+    batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(6)]
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6, 8, 10]
+    batcher.close()
+
+
+def test_cancelled_item_is_skipped_and_worker_survives():
+    batch_fn = GatedDouble()
+    batcher = MicroBatcher(batch_fn, max_batch_size=1, max_wait_ms=0)
+    first = batcher.submit(1)       # picked up by the worker, which blocks in batch_fn
+    cancelled = batcher.submit(2)   # still queued
+    assert cancelled.cancel()
+    batch_fn.release.set()
+
+    assert first.result(timeout=5) == 2
+    with pytest.raises(CancelledError):
+        cancelled.result(timeout=5)
+    assert batcher.submit(3).result(timeout=5) == 6
+    assert [2] not in batch_fn.batches
+    batcher.close()
+
+
+def test_batch_fn_errors_reach_every_caller():
+    def fail(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(fail, max_wait_ms=20)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+    batcher.close()
+
+
+def test_wrong_result_count_fails_the_batch():
+    batcher = MicroBatcher(lambda items: [], max_wait_ms=0)
+    with pytest.raises(RuntimeError):
+        batcher.submit(1).result(timeout=5)
+    batcher.close()
+
+
+def test_close_finishes_queued_items_and_rejects_new_ones():
+    batch_fn = GatedDouble()
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=0)
+    futures = [batcher.submit(i) for i in range(4)]
+    closer = threading.Thread(target=batcher.close)
+    closer.start()
+    batch_fn.release.set()
+    closer.join(5)
+
+    assert not closer.is_alive()
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6]
+    with pytest.raises(RuntimeError):
+        batcher.submit(5)
+    batcher.close()
@@ -0,0 +1,69 @@
+# tests/test_domain_reputation.py
+import pytest
+
+from ar_phishing_detector.domain_reputation import BloomFilter, DomainReputation, normalize_domain
+
+BLOCKLIST = ['evil.com', 'xn--pypal-4ve.com', 'Bad.Example.ORG.']
+
+
+@pytest.fixture(params=[False, True], ids=['set', 'bloom'])
+def reputation(request):
+    return DomainReputation(BLOCKLIST, use_bloom=request.param)
+
+
+def test_exact_and_parent_domains_match(reputation):
+    assert reputation.match('evil.com') == 'evil.com'
+    assert reputation.match('a.b.evil.com') == 'evil.com'
+    assert reputation.match('bad.example.org') == 'bad.example.org'
+
+
+def test_lookalike_and_unrelated_domains_do_not_match(reputation):
+    assert reputation.match('notevil.com') is None
+    assert reputation.match('evil.com.au') is None
+    assert reputation.match('example.org') is None
+
+
+def test_lookups_are_normalised(reputation):
+    assert reputation.match('user@EVIL.com:8080') == 'evil.com'
+    assert reputation.is_blocked('login.evil.com.')
+
+
+def test_unicode_domains_match_punycode_entries(reputation):
+    # Cyrillic 'а' in "pаypal.com"
+    assert reputation.match('pаypal.com') == 'xn--pypal-4ve.com'
+    assert reputation.match('login.pаypal.com') == 'xn--pypal-4ve.com'
+
+
+def test_unicode_entries_match_punycode_lookups():
+    reputation = DomainReputation(['pаypal.com'])
+    assert reputation.match('xn--pypal-4ve.com') == 'xn--pypal-4ve.com'
+
+
+def test_normalize_domain():
+    assert normalize_domain(' Admin@Shop.Example.COM:443. ') == 'shop.example.com'
+    assert normalize_domain('[::1]:8080') == '[::1]'
+
+
+def test_add_many_extends_the_bloom_filter_incrementally():
+    reputation = DomainReputation([f"d{i}.com" for i in range(100)], use_bloom=True)
+    bloom = reputation._bloom
+    reputation.add_many(['late.com'])
+    assert reputation._bloom is bloom
+    assert reputation.match('www.late.com') == 'late.com'
+    assert len(reputation) == 101
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    items = [f"item{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+
+
+def test_from_file_skips_comments(tmp_path):
+    path = tmp_path / "blocklist.txt"
+    path.write_text("# feed\nevil.com  # reported\n\nphish.net\n", encoding='utf-8')
+    reputation = DomainReputation.from_file(str(path))
+    assert len(reputation) == 2
+    assert reputation.match('x.phish.net') == 'phish.net'
@@ -0,0 +1,56 @@
+# tests/test_keyword_matcher.py
+import pytest
+
+from deepfake_detector_core.keyword_matcher import KeywordMatcher, load_keywords
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(
+        ['login', 'security', 'security alert', 'verify', 'click here'],
+        prefixes=['urgent', 'immediate'],
+        suffixes=['now', 'required']
+    )
+
+
+def test_matches_whole_words_case_insensitively(matcher):
+    assert matcher.find("Please LOGIN to continue") == [('login', 0.6)]
+
+
+def test_ignores_keywords_inside_longer_words(matcher):
+    assert matcher.find("relogin loginpage bloginx") == []
+
+
+def test_prefix_context_boosts_confidence(matcher):
+    assert matcher.find("urgent login") == [('login', 0.9)]
+    assert matcher.find("immediate\n security check") == [('security', 0.9)]
+
+
+def test_prefix_must_be_a_whole_word(matcher):
+    assert matcher.find("urgently login") == [('login', 0.6)]
+
+
+def test_suffix_context_boosts_confidence(matcher):
+    assert matcher.find("verify now") == [('verify', 0.9)]
+    assert matcher.find("verify nowhere") == [('verify', 0.6)]
+
+
+def test_phrases_match_across_whitespace_and_report_contained_keywords(matcher):
+    assert matcher.find("Security Alert: click   here") == [
+        ('security', 0.6), ('security alert', 0.6), ('click here', 0.6)
+    ]
+
+
+def test_each_keyword_reported_once_with_its_best_confidence(matcher):
+    assert matcher.find("login, then urgent login") == [('login', 0.9)]
+
+
+def test_empty_inputs():
+    assert KeywordMatcher([]).find("login") == []
+    assert KeywordMatcher(['login']).find("") == []
+
+
+def test_load_keywords_skips_blanks_and_comments(tmp_path):
+    path = tmp_path / "keywords.txt"
+    path.write_text("# lures\nGift Card\n\n  wire transfer  \n", encoding='utf-8')
+    assert load_keywords(str(path)) == ['gift card', 'wire transfer']
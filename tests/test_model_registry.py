@@ -0,0 +1,53 @@
+# tests/test_model_registry.py
+import os
+
+import pytest
+
+from deepfake_detector_core.model_registry import ModelRegistry
+
+
+class Counted:
+    loads = 0
+
+    def __init__(self, **kwargs):
+        Counted.loads += 1
+        self.kwargs = kwargs
+
+
+def test_settings_key_does_not_load_the_model():
+    Counted.loads = 0
+    registry = ModelRegistry({'ocr': Counted})
+    registry.register('ocr', mode='roi')
+
+    key = registry.settings_key('ocr')
+
+    assert Counted.loads == 0
+    assert not registry.loaded()
+    assert "mode='roi'" in key
+
+
+def test_settings_key_follows_registered_defaults():
+    registry = ModelRegistry({'ocr': 'ar_phishing_detector.ocr_analysis:OCRAnalyzer'})
+    default = registry.settings_key('ocr')
+    registry.register('ocr', mode='tiled')
+
+    assert registry.settings_key('ocr') != default
+    assert registry.settings_key('ocr').startswith('ar_phishing_detector.ocr_analysis:OCRAnalyzer(')
+
+
+def test_settings_key_changes_when_a_settings_file_is_edited(tmp_path):
+    blocklist = tmp_path / "blocklist.txt"
+    blocklist.write_text("evil.example\n")
+    registry = ModelRegistry({'ocr': Counted})
+    registry.register('ocr', blocklist_file=str(blocklist))
+    before = registry.settings_key('ocr')
+
+    blocklist.write_text("evil.example\nworse.example\n")
+    os.utime(blocklist, ns=(0, 0))
+
+    assert registry.settings_key('ocr') != before
+
+
+def test_settings_key_of_unknown_model_raises():
+    with pytest.raises(KeyError):
+        ModelRegistry().settings_key('missing')
@@ -0,0 +1,41 @@
+# tests/test_ocr_tiling.py
+import pytest
+
+pytest.importorskip("cv2")
+
+from ar_phishing_detector.ocr_analysis import _merge_tile_lines, _tile_origins  # noqa: E402
+
+
+def box(x1, y1, x2, y2):
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+def test_tile_origins_cover_the_image_with_overlap():
+    origins = _tile_origins(3000, 1280, 160)
+    assert origins[0] == 0
+    assert origins[-1] == 3000 - 1280
+    assert all(b - a <= 1280 - 160 for a, b in zip(origins, origins[1:]))
+
+
+def test_small_images_are_a_single_tile():
+    assert _tile_origins(800, 1280, 160) == [0]
+
+
+def test_line_on_a_seam_is_kept_once_as_its_larger_copy():
+    full = (box(1100, 50, 1300, 80), 'Verify your account', 0.9)
+    cut = (box(1120, 50, 1280, 80), 'your accou', 0.7)
+    assert _merge_tile_lines([[full], [cut]]) == [full]
+    assert _merge_tile_lines([[cut], [full]]) == [full]
+
+
+def test_lines_of_one_tile_are_never_merged():
+    outer = (box(0, 0, 300, 40), 'Sign in', 0.9)
+    inner = (box(10, 5, 290, 35), 'Sign in', 0.8)
+    assert len(_merge_tile_lines([[outer, inner]])) == 2
+
+
+def test_neighbouring_lines_with_small_overlap_are_kept():
+    upper = (box(1100, 50, 1300, 80), 'Password', 0.9)
+    lower = (box(1100, 75, 1300, 105), 'Forgot password?', 0.9)
+    merged = _merge_tile_lines([[upper], [lower]])
+    assert sorted(text for _, text, _ in merged) == ['Forgot password?', 'Password']
@@ -0,0 +1,103 @@
+# tests/test_result_cache.py
+import pickle
+import sqlite3
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from deepfake_detector_core.result_cache import ResultCache, content_digest  # noqa: E402
+
+
+def blob_size(value):
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_evicts_least_recently_used_beyond_max_bytes():
+    value = {'payload': 'x' * 100}
+    cache = ResultCache(max_bytes=blob_size(value) * 2)
+    cache.put('a', value)
+    cache.put('b', value)
+    assert cache.get('a') == value  # 'a' becomes the most recently used
+    cache.put('c', value)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == value
+    assert cache.get('c') == value
+    assert cache.stats()['bytes'] <= cache.max_bytes
+
+
+def test_replacing_a_key_does_not_double_count_its_size():
+    cache = ResultCache()
+    cache.put('a', {'payload': 'x' * 100})
+    cache.put('a', {'payload': 'y'})
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['bytes'] == blob_size({'payload': 'y'})
+
+
+def test_values_larger_than_the_cache_are_not_kept():
+    cache = ResultCache(max_bytes=10)
+    cache.put('a', {'payload': 'x' * 100})
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_error_results_are_not_cached():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'error': 'boom'}
+
+    cache.get_or_compute('k', compute)
+    cache.get_or_compute('k', compute)
+    assert len(calls) == 2
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ResultCache(disk_path=path).put('k', {'label': 'Phishing'})
+    cache = ResultCache(disk_path=path)
+    assert cache.get('k') == {'label': 'Phishing'}
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_keys_depend_on_content_and_version(tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"same bytes")
+    assert content_digest(str(path)) == content_digest(b"same bytes")
+    assert ResultCache.make_key('op', 'v1', b"data") != ResultCache.make_key('op', 'v2', b"data")
+
+
+def test_disk_tier_runs_in_wal_mode(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ResultCache(disk_path=path)
+
+    with sqlite3.connect(path) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+
+def test_locked_database_skips_the_write_but_keeps_the_result(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(disk_path=path, busy_timeout=0)
+    other = sqlite3.connect(path)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        cache.put('k', {'label': 'Phishing'})
+    finally:
+        other.rollback()
+        other.close()
+
+    assert cache.get('k') == {'label': 'Phishing'}
+    assert ResultCache(disk_path=path).get('k') is None
+
+
+def test_database_read_errors_are_misses(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(disk_path=path)
+    with sqlite3.connect(path) as db:
+        db.execute("DROP TABLE results")
+
+    assert cache.get('k') is None
+    assert cache.stats()['misses'] == 1
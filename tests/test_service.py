@@ -0,0 +1,73 @@
+# tests/test_service.py
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+from deepfake_detector_core.batching import MicroBatcher  # noqa: E402
+from service.server import InferenceService, create_app  # noqa: E402
+
+
+class StubService(InferenceService):
+    """InferenceService whose image batcher wraps a gated stub instead of Xception."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+        self.seen = []
+
+    def classify(self, items):
+        self.release.wait(5)
+        self.seen.extend(items)
+        return [{'label': 'Legitimate', 'size': len(item), 'error': None} for item in items]
+
+    async def start(self, app):
+        self.image_batcher = MicroBatcher(self.classify, max_batch_size=1, max_wait_ms=0)
+
+
+def test_cancelled_image_request_does_not_break_the_batcher():
+    async def scenario():
+        service = StubService(max_pending={'image': 2})
+        async with TestClient(TestServer(create_app(service))) as client:
+            # The first request occupies the worker; the second queues behind it
+            first = asyncio.ensure_future(service._classify_image(b'first', ''))
+            aborted = asyncio.ensure_future(service._classify_image(b'aborted', ''))
+            await asyncio.sleep(0.05)
+            aborted.cancel()
+            await asyncio.sleep(0.05)  # cancellation reaches the batcher's Future via a loop callback
+            service.release.set()
+
+            assert (await first)['size'] == 5
+            with pytest.raises(asyncio.CancelledError):
+                await aborted
+
+            response = await client.post('/v1/image', data=b'after')
+            assert response.status == 200
+            assert (await response.json())['size'] == 5
+            assert service.admission['image'].pending == 0
+            assert b'aborted' not in service.seen
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_handler_releases_its_admission_slot():
+    async def scenario():
+        service = StubService(max_pending={'image': 1})
+        async with TestClient(TestServer(create_app(service))) as client:
+            request = asyncio.ensure_future(client.post('/v1/image', data=b'slow'))
+            for _ in range(100):
+                if service.admission['image'].pending:
+                    break
+                await asyncio.sleep(0.01)
+            assert service.admission['image'].pending == 1
+            assert (await client.post('/v1/image', data=b'busy')).status == 429
+
+            service.release.set()
+            assert (await request).status == 200
+            assert service.admission['image'].pending == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+# tests/test_streaming.py
+from types import SimpleNamespace
+
+import numpy as np
+
+from voice_phishing_detector.streaming import StreamingPhishingDetector
+
+
+class ScriptedWhisper:
+    """Transcribes each chunk to the next line of a script."""
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+
+    def transcribe(self, chunk, fp16=False, initial_prompt=None):
+        return {'text': next(self.lines)}
+
+
+class RecordingNLP:
+    def __init__(self):
+        self.texts = []
+
+    def detect_phishing_nlp(self, text):
+        self.texts.append(text)
+        return {'label': 'Legitimate', 'confidence': 10.0, 'is_phishing': False}
+
+
+def make_detector(lines, **kwargs):
+    transcriber = SimpleNamespace(model=ScriptedWhisper(lines))
+    nlp = RecordingNLP()
+    return StreamingPhishingDetector(transcriber=transcriber, nlp=nlp, **kwargs), nlp
+
+
+def test_context_is_the_last_whole_segments():
+    lines = [f"segment number {i} " + "word " * 200 for i in range(5)]
+    detector, nlp = make_detector(lines, context_segments=2)
+    chunk = np.zeros(160, dtype=np.float32)
+
+    for _ in lines:
+        detector._process_chunk(chunk)
+
+    assert nlp.texts[0] == lines[0].strip()
+    assert nlp.texts[-1] == f"{lines[3].strip()} {lines[4].strip()}"
+
+
+def test_updates_still_report_the_full_transcript():
+    lines = ["hello this is your bank", "please confirm your password"]
+    detector, _ = make_detector(lines, context_segments=1)
+    chunk = np.zeros(160, dtype=np.float32)
+
+    updates = [detector._process_chunk(chunk) for _ in lines]
+
+    assert updates[-1]['transcript'] == " ".join(lines)
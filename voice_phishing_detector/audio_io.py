@@ -0,0 +1,78 @@
+# voice_phishing_detector/audio_io.py
+import os
+import subprocess
+import tempfile
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def check_ffmpeg():
+    """Return True if the ffmpeg binary can be run."""
+    try:
+        subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+def pcm16_to_float(data):
+    """Convert little-endian 16-bit PCM bytes to float32 samples in [-1, 1]."""
+    return np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def _is_seekable_container(data):
+    """
+    True for ISO base media files (MP4, M4A, MOV, 3GP), which ffmpeg may need to
+    seek in: phone recordings usually keep the moov index at the end of the file.
+    """
+    return len(data) >= 12 and data[4:8] == b'ftyp'
+
+
+def _run_ffmpeg(input_arg, stdin_data, sr):
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", input_arg,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr), "pipe:1"
+    ]
+    try:
+        return subprocess.run(cmd, input=stdin_data, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"FFmpeg decoding failed: {e.stderr.decode(errors='ignore')}") from e
+
+
+def _run_ffmpeg_on_copy(data, sr):
+    """Decode encoded bytes from a private temporary file, so ffmpeg can seek."""
+    fd, path = tempfile.mkstemp(prefix="aura_guard_audio_")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return _run_ffmpeg(path, None, sr)
+    finally:
+        os.remove(path)
+
+
+def decode_audio(source, sr=SAMPLE_RATE):
+    """
+    Decode audio into a mono float32 array at sr Hz, the format Whisper consumes.
+
+    source may be a file path, the encoded bytes of any format ffmpeg reads, or an
+    already decoded float32 array (returned unchanged). ffmpeg writes raw PCM to a
+    pipe, so no intermediate WAV file is created. Encoded bytes are streamed to
+    ffmpeg's stdin, except for MP4/M4A containers (and any input the pipe fails
+    on), which ffmpeg reads from a temporary copy because it cannot seek a pipe.
+    """
+    if isinstance(source, np.ndarray):
+        return source.astype(np.float32, copy=False)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = bytes(source)
+        if _is_seekable_container(data):
+            return pcm16_to_float(_run_ffmpeg_on_copy(data, sr))
+        try:
+            return pcm16_to_float(_run_ffmpeg("pipe:0", data, sr))
+        except RuntimeError:
+            return pcm16_to_float(_run_ffmpeg_on_copy(data, sr))
+
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Audio file not found: {source}")
+    return pcm16_to_float(_run_ffmpeg(os.fspath(source), None, sr))
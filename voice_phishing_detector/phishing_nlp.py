@@ -1,14 +1,49 @@
 # voice_phishing_detector/phishing_nlp.py
-from transformers import pipeline
+import hashlib
+import os
 import re
-import transformers
-from transformers import pipeline
+from deepfake_detector_core.backends import OnnxRunner, check_backend, export_onnx, onnx_cache_path
+from deepfake_detector_core.keyword_matcher import KeywordMatcher, load_keywords
+from deepfake_detector_core.metrics import span, timed
+from deepfake_detector_core.quantization import check_precision, inference_context, quantize_model
 
-assert hasattr(transformers, "pipeline"), "Transformers version too old!"
+
+def _logits_only(model):
+    """Wrap a transformers classifier so ONNX export sees a plain logits output."""
+    import torch
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+    return LogitsOnly()
 
 
 class PhishingNLPDetector:
-    def __init__(self):
+    # Bump when keyword lists or scoring change so cached results are not reused
+    CACHE_VERSION = "1"
+
+    def __init__(self, cache=None, keyword_file=None, precision='fp32', backend='torch'):
+        """
+        cache is an optional ResultCache for detect_phishing_nlp. keyword_file
+        optionally adds one lure keyword or phrase per line to the built-in list.
+        precision selects CPU inference mode: 'fp32', 'int8' (dynamic quantisation
+        of the transformer's linear layers) or 'bf16' (autocast, where supported).
+        backend='onnx' runs the classifier through a cached ONNX export on ONNX
+        Runtime (fp32 only), falling back to torch if it cannot be exported or loaded.
+        """
+        # Imported here so that importing the package does not pull in torch or transformers
+        import transformers
+        from transformers import pipeline
+
+        assert hasattr(transformers, "pipeline"), "Transformers version too old!"
+
+        self.precision = check_precision(precision)
+        self.backend = check_backend(backend)
         # Use a DistilBERT model fine-tuned for phishing detection (placeholder for custom model)
         try:
             self.classifier = pipeline(
@@ -22,6 +57,18 @@ class PhishingNLPDetector:
             # Fallback to a simpler model
             self.classifier = pipeline("text-classification", model="unitary/toxic-bert", top_k=None)
 
+        if precision == 'int8':
+            self.classifier.model = quantize_model(self.classifier.model, precision)
+
+        self.onnx_runner = None
+        if self.backend == 'onnx':
+            if precision == 'fp32':
+                self.onnx_runner = self._load_onnx()
+            else:
+                print(f"ONNX backend supports fp32 only, using torch for {precision}")
+        if self.onnx_runner is None:
+            self.backend = 'torch'
+
         self.phishing_keywords = [
             "verify", "urgent", "account", "transfer", "otp", "security alert",
             "support team", "click here", "update your details", "password",
@@ -30,9 +77,180 @@ class PhishingNLPDetector:
         self.context_phrases = [
             "immediately", "now", "required", "secure", "critical", "action needed"
         ]
+        # Keyword scores are normalised by the size of the built-in list, so loading a
+        # large lure corpus adds matches instead of diluting every match towards zero
+        self.keyword_norm = len(self.phishing_keywords)
+        if keyword_file:
+            self.phishing_keywords += load_keywords(keyword_file)
+        # Context phrases boost a keyword whether they come before or after it
+        self.keyword_matcher = KeywordMatcher(
+            self.phishing_keywords, prefixes=self.context_phrases, suffixes=self.context_phrases
+        )
+        self.cache = cache
+
+    @property
+    def cache_version(self):
+        keywords_digest = hashlib.sha256("\n".join(self.phishing_keywords).encode('utf-8')).hexdigest()[:12]
+        return f"{self.CACHE_VERSION}:{self.classifier.model.name_or_path}:{self.precision}:{keywords_digest}"
 
+    @timed('detect_phishing_nlp')
     def detect_phishing_nlp(self, text):
-        """Detect phishing in text using NLP model and keyword analysis."""
+        """
+        Detect phishing in text using NLP model and keyword analysis.
+        With metrics enabled the result carries a per-stage 'timings' breakdown in ms.
+        """
+        if self.cache is None or not isinstance(text, str):
+            return self._detect_phishing_nlp(text)
+        # Hash the text itself, never treat it as a path
+        return self.cache.cached_call('detect_phishing_nlp', self.cache_version, text.encode('utf-8'),
+                                      lambda: self._detect_phishing_nlp(text))
+
+    def _load_onnx(self):
+        """Load the cached ONNX export of the classifier, exporting it on first use."""
+        try:
+            name = "nlp_" + self.classifier.model.name_or_path.replace('/', '_')
+            path = onnx_cache_path(name)
+            if not os.path.exists(path):
+                example = self.classifier.tokenizer(["example text"], return_tensors='pt')
+                path = export_onnx(
+                    _logits_only(self.classifier.model), (example['input_ids'], example['attention_mask']), name,
+                    input_names=['input_ids', 'attention_mask'], output_names=['logits'],
+                    dynamic_axes={'input_ids': {0: 'batch', 1: 'sequence'},
+                                  'attention_mask': {0: 'batch', 1: 'sequence'},
+                                  'logits': {0: 'batch'}}
+                )
+            return OnnxRunner(path)
+        except Exception as e:
+            print(f"Error loading ONNX NLP model, falling back to torch: {str(e)}")
+            return None
+
+    def _window_scores(self, texts, batch_size=16, window_tokens=512, stride=128):
+        """
+        Score each text with the transformer over overlapping token windows.
+
+        Texts are tokenised together and split into windows of window_tokens
+        tokens that overlap by stride tokens, so long transcripts are scored in
+        full. Windows are sorted by length and run in padded batches of
+        batch_size to keep padding to a minimum. A text's score is the highest
+        phishing score of its windows.
+        """
+        import torch
+
+        tokenizer = self.classifier.tokenizer
+        model = self.classifier.model
+        with span('nlp.tokenize'):
+            encodings = tokenizer(
+                texts, truncation=True, max_length=window_tokens, stride=stride,
+                return_overflowing_tokens=True, padding=False
+            )
+        windows = encodings['input_ids']
+        owners = encodings['overflow_to_sample_mapping']
+
+        # Length bucketing: neighbouring windows in sorted order have similar lengths
+        order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+        multi_label = model.config.problem_type == "multi_label_classification" or model.config.num_labels == 1
+        scores = [0.0] * len(texts)
+
+        for start in range(0, len(order), batch_size):
+            batch_ids = order[start:start + batch_size]
+            batch = tokenizer.pad({'input_ids': [windows[i] for i in batch_ids]}, return_tensors='pt')
+            with span('nlp.forward'):
+                if self.onnx_runner is not None:
+                    logits = self.onnx_runner(**batch).float()
+                else:
+                    batch = {key: value.to(model.device) for key, value in batch.items()}
+                    with torch.no_grad(), inference_context(self.precision):
+                        logits = model(**batch).logits.float()
+            probs = torch.sigmoid(logits) if multi_label else torch.softmax(logits, dim=-1)
+            top_scores, top_labels = probs.max(dim=-1)
+
+            for i, score, label_id in zip(batch_ids, top_scores.tolist(), top_labels.tolist()):
+                label = model.config.id2label[label_id]
+                nlp_score = score if label.lower().startswith('positive') else 1.0 - score
+                owner = owners[i]
+                scores[owner] = max(scores[owner], nlp_score)
+
+        return scores
+
+    def _score_text(self, text, nlp_score):
+        """Combine the transformer score with keyword analysis of the full text."""
+        # Keyword analysis with context
+        with span('nlp.keywords'):
+            matches = self.keyword_matcher.find(text)
+        keyword_score = sum(confidence for _, confidence in matches)
+
+        # Normalize keyword score
+        keyword_score = min(keyword_score / self.keyword_norm, 1.0) if matches else 0.0
+
+        # Ensemble scoring
+        final_confidence = (nlp_score * 0.6 + keyword_score * 0.4)
+        label = "Phishing" if final_confidence > 0.65 else "Safe"
+        is_phishing = final_confidence > 0.65
+
+        return {
+            'label': label,
+            'confidence': round(final_confidence * 100, 2),
+            'is_phishing': is_phishing,
+            'nlp_score': round(nlp_score * 100, 2),
+            'keyword_matches': matches
+        }
+
+    def detect_phishing_batch(self, texts, batch_size=16):
+        """
+        Detect phishing in many texts at once; results are in input order and in
+        the same format as detect_phishing_nlp. Cached texts are not rescored.
+        """
+        texts = list(texts)
+        results = [None] * len(texts)
+        pending = []
+
+        for i, text in enumerate(texts):
+            if not text or not isinstance(text, str):
+                results[i] = {
+                    'label': 'Error',
+                    'confidence': 0.0,
+                    'is_phishing': False,
+                    'matches': [],
+                    'error': 'Invalid or empty text input'
+                }
+                continue
+            if self.cache is not None:
+                cached = self.cache.get(self.cache.make_key('detect_phishing_nlp', self.cache_version,
+                                                            text.encode('utf-8')))
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            pending.append(i)
+
+        if not pending:
+            return results
+
+        lowered = [texts[i].lower() for i in pending]
+        try:
+            nlp_scores = self._window_scores(lowered, batch_size=batch_size)
+        except Exception as e:
+            print(f"Error in NLP classification: {str(e)}")
+            nlp_scores = [0.0] * len(pending)
+
+        for i, text, nlp_score in zip(pending, lowered, nlp_scores):
+            try:
+                results[i] = self._score_text(text, nlp_score)
+                if self.cache is not None:
+                    self.cache.put(self.cache.make_key('detect_phishing_nlp', self.cache_version,
+                                                       texts[i].encode('utf-8')), results[i])
+            except Exception as e:
+                print(f"Error in phishing NLP detection: {str(e)}")
+                results[i] = {
+                    'label': 'Error',
+                    'confidence': 0.0,
+                    'is_phishing': False,
+                    'matches': [],
+                    'error': str(e)
+                }
+
+        return results
+
+    def _detect_phishing_nlp(self, text):
         try:
             if not text or not isinstance(text, str):
                 return {
@@ -43,44 +261,17 @@ class PhishingNLPDetector:
                     'error': 'Invalid or empty text input'
                 }
 
-            # Limit text to 512 tokens for transformer models
-            text = text[:512].lower()
+            # Score the whole text through overlapping 512-token windows
+            text = text.lower()
 
             # NLP model prediction
             try:
-                result = self.classifier(text)[0]
-                nlp_score = result['score'] if result['label'].lower().startswith('positive') else 1.0 - result['score']
+                nlp_score = self._window_scores([text])[0]
             except Exception as e:
                 print(f"Error in NLP classification: {str(e)}")
                 nlp_score = 0.0
 
-            # Keyword analysis with context
-            matches = []
-            keyword_score = 0.0
-            for kw in self.phishing_keywords:
-                if kw in text:
-                    # Check for contextual phrases to increase confidence
-                    context_found = any(f"{kw} {phrase}" in text or f"{phrase} {kw}" in text
-                                        for phrase in self.context_phrases)
-                    confidence = 0.9 if context_found else 0.6
-                    matches.append((kw, confidence))
-                    keyword_score += confidence
-
-            # Normalize keyword score
-            keyword_score = min(keyword_score / len(self.phishing_keywords), 1.0) if matches else 0.0
-
-            # Ensemble scoring
-            final_confidence = (nlp_score * 0.6 + keyword_score * 0.4)
-            label = "Phishing" if final_confidence > 0.65 else "Safe"
-            is_phishing = final_confidence > 0.65
-
-            return {
-                'label': label,
-                'confidence': round(final_confidence * 100, 2),
-                'is_phishing': is_phishing,
-                'nlp_score': round(nlp_score * 100, 2),
-                'keyword_matches': matches
-            }
+            return self._score_text(text, nlp_score)
 
         except Exception as e:
             print(f"Error in phishing NLP detection: {str(e)}")
@@ -90,4 +281,4 @@ class PhishingNLPDetector:
                 'is_phishing': False,
                 'matches': [],
                 'error': str(e)
-            }
\ No newline at end of file
+            }
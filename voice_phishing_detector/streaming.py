@@ -0,0 +1,172 @@
+# voice_phishing_detector/streaming.py
+import numpy as np
+
+from deepfake_detector_core.metrics import span, timed
+from deepfake_detector_core.model_registry import get_model
+from .audio_io import SAMPLE_RATE, decode_audio, pcm16_to_float
+
+
+class EnergyVAD:
+    """
+    Energy-based voice activity detection over 16 kHz mono float32 audio.
+
+    Samples are fed incrementally; a speech chunk is emitted once it is followed
+    by min_silence_ms of silence or reaches max_chunk_s. Chunks with less than
+    min_speech_ms of speech are treated as noise and dropped.
+    """
+
+    def __init__(self, energy_threshold=0.01, frame_ms=30, min_silence_ms=600,
+                 min_speech_ms=300, max_chunk_s=20.0):
+        self.energy_threshold = energy_threshold
+        self.frame_len = SAMPLE_RATE * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.min_silence_ms = min_silence_ms
+        self.min_speech_ms = min_speech_ms
+        self.max_chunk_len = int(SAMPLE_RATE * max_chunk_s)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._chunk = []
+        self._chunk_len = 0
+        self._speech_ms = 0
+        self._silence_ms = 0
+
+    def _emit(self):
+        chunk = np.concatenate(self._chunk) if self._chunk else None
+        keep = chunk is not None and self._speech_ms >= self.min_speech_ms
+        self._chunk = []
+        self._chunk_len = 0
+        self._speech_ms = 0
+        self._silence_ms = 0
+        return chunk if keep else None
+
+    def feed(self, samples):
+        """Feed float32 samples; return the list of speech chunks completed by them."""
+        samples = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        n_frames = len(samples) // self.frame_len
+        self._pending = samples[n_frames * self.frame_len:]
+
+        chunks = []
+        for i in range(n_frames):
+            frame = samples[i * self.frame_len:(i + 1) * self.frame_len]
+            is_speech = np.sqrt(np.mean(frame ** 2)) >= self.energy_threshold
+
+            if is_speech:
+                self._speech_ms += self.frame_ms
+                self._silence_ms = 0
+            elif self._chunk:
+                self._silence_ms += self.frame_ms
+            else:
+                # Leading silence, nothing to attach it to
+                continue
+
+            self._chunk.append(frame)
+            self._chunk_len += len(frame)
+
+            if self._silence_ms >= self.min_silence_ms or self._chunk_len >= self.max_chunk_len:
+                chunk = self._emit()
+                if chunk is not None:
+                    chunks.append(chunk)
+        return chunks
+
+    def flush(self):
+        """Return the speech chunk still being collected, if any."""
+        if len(self._pending):
+            self._chunk.append(self._pending)
+            self._pending = np.zeros(0, dtype=np.float32)
+        chunk = self._emit()
+        return [chunk] if chunk is not None else []
+
+
+class StreamingPhishingDetector:
+    """
+    Incremental voice-phishing detection.
+
+    Audio is split into voice-activity chunks, each chunk is transcribed as soon
+    as it completes and the last context_segments whole segments are rescored
+    with PhishingNLPDetector, whose token windows cover their full length. Every
+    chunk produces an update with the running verdict (the highest confidence
+    seen so far); the first update whose confidence reaches alert_threshold
+    carries alert=True and triggers on_alert.
+    """
+
+    def __init__(self, transcriber=None, nlp=None, alert_threshold=65.0, on_alert=None,
+                 vad=None, context_segments=8):
+        self.transcriber = transcriber or get_model('transcriber')
+        self.nlp = nlp or get_model('nlp')
+        self.alert_threshold = alert_threshold
+        self.on_alert = on_alert
+        self.vad = vad or EnergyVAD()
+        self.context_segments = context_segments
+        self.reset()
+
+    def reset(self):
+        self.segments = []
+        self.samples_seen = 0
+        self.best_result = None
+        self.alerted = False
+
+    @property
+    def transcript(self):
+        return " ".join(self.segments)
+
+    @timed('stream.chunk')
+    def _process_chunk(self, chunk):
+        with span('whisper.transcribe'):
+            result = self.transcriber.model.transcribe(
+                chunk, fp16=False, initial_prompt=self.segments[-1] if self.segments else None
+            )
+        text = result["text"].strip()
+        if not text:
+            return None
+        self.segments.append(text)
+
+        # Score whole recent segments so later parts of a long call are not cut off
+        # and no segment is scored from the middle of a word
+        context = " ".join(self.segments[-self.context_segments:])
+        nlp_result = self.nlp.detect_phishing_nlp(context)
+        if self.best_result is None or nlp_result['confidence'] > self.best_result['confidence']:
+            self.best_result = nlp_result
+
+        alert = not self.alerted and self.best_result['confidence'] >= self.alert_threshold
+        update = {
+            'segment_text': text,
+            'transcript': self.transcript,
+            'audio_seconds': self.samples_seen / SAMPLE_RATE,
+            'segment_result': nlp_result,
+            'label': self.best_result['label'],
+            'confidence': self.best_result['confidence'],
+            'is_phishing': self.best_result['is_phishing'],
+            'alert': alert
+        }
+        if alert:
+            self.alerted = True
+            if self.on_alert is not None:
+                self.on_alert(update)
+        return update
+
+    def feed(self, samples):
+        """
+        Feed live audio: 16 kHz mono float32 samples, or 16-bit PCM bytes.
+        Returns the updates produced by chunks completed by this audio.
+        """
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = pcm16_to_float(samples)
+        self.samples_seen += len(samples)
+        updates = [self._process_chunk(chunk) for chunk in self.vad.feed(samples)]
+        return [update for update in updates if update is not None]
+
+    def finish(self):
+        """Flush the last chunk at the end of the stream."""
+        updates = [self._process_chunk(chunk) for chunk in self.vad.flush()]
+        return [update for update in updates if update is not None]
+
+    def process_stream(self, stream):
+        """Yield updates while consuming an iterable of PCM blocks (arrays or bytes)."""
+        for block in stream:
+            yield from self.feed(block)
+        yield from self.finish()
+
+    def process_file(self, audio_path, block_seconds=1.0):
+        """Yield updates for an audio file or encoded bytes, fed in block_seconds blocks as if it were live."""
+        audio = decode_audio(audio_path)
+        block = int(SAMPLE_RATE * block_seconds)
+        yield from self.process_stream(audio[i:i + block] for i in range(0, len(audio), block))
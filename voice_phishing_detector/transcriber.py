@@ -1,77 +1,75 @@
 # voice_phishing_detector/transcriber.py
-import os
-import whisper
-import subprocess
-import tempfile
+from deepfake_detector_core.image_io import describe_source
+from deepfake_detector_core.metrics import span, timed
+from .audio_io import check_ffmpeg, decode_audio
+
 
 class AudioTranscriber:
-    def __init__(self, model_name="base"):
+    # Bump when transcription settings change so cached transcripts are not reused
+    CACHE_VERSION = "1"
+
+    def __init__(self, model_name="base", cache=None):
+        """cache is an optional ResultCache for transcribe_audio."""
+        import whisper
+
         # Ensure ffmpeg is available
-        try:
-            subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        if not check_ffmpeg():
             raise RuntimeError("FFmpeg not found. Please install FFmpeg and ensure it's in PATH.")
 
         # Load Whisper model
         try:
             self.model = whisper.load_model(model_name)
+            self.model_name = model_name
         except Exception as e:
             print(f"Error loading Whisper model {model_name}: {str(e)}")
             # Fallback to smallest model
             self.model = whisper.load_model("tiny")
+            self.model_name = "tiny"
+
+        self.cache = cache
 
     def preprocess_audio(self, audio_path):
-        """Preprocess audio by converting to WAV format if needed."""
+        """
+        Decode audio (file path, encoded bytes or float32 array) straight into a
+        16 kHz mono float32 array through an ffmpeg pipe.
+        """
         try:
-            if not os.path.exists(audio_path):
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
-
-            # Check if audio is already in WAV format
-            if not audio_path.lower().endswith('.wav'):
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                    temp_path = temp_file.name
-                    subprocess.run([
-                        "ffmpeg", "-i", audio_path, "-ar", "16000", "-ac", "1",
-                        "-c:a", "pcm_s16le", temp_path
-                    ], check=True, capture_output=True)
-                return temp_path
-            return audio_path
-
+            with span('audio.decode'):
+                return decode_audio(audio_path)
         except Exception as e:
-            print(f"Error preprocessing audio {audio_path}: {str(e)}")
+            print(f"Error preprocessing audio {describe_source(audio_path)}: {str(e)}")
             return None
 
+    @timed('transcribe_audio')
     def transcribe_audio(self, audio_path):
-        """Transcribe audio with error handling and cleanup."""
-        temp_file = None
+        """
+        Transcribe audio (file path, encoded bytes or 16 kHz float32 array) with error handling.
+        With metrics enabled the result carries a per-stage 'timings' breakdown in ms.
+        """
+        if self.cache is None:
+            return self._transcribe_audio(audio_path)
+        return self.cache.cached_call('transcribe_audio', f"{self.CACHE_VERSION}:whisper-{self.model_name}",
+                                      audio_path, lambda: self._transcribe_audio(audio_path))
+
+    def _transcribe_audio(self, audio_path):
         try:
-            processed_path = self.preprocess_audio(audio_path)
-            if processed_path is None:
+            audio = self.preprocess_audio(audio_path)
+            if audio is None:
                 return {
                     'text': '',
                     'error': 'Audio preprocessing failed'
                 }
 
-            # Store temp file path for cleanup
-            if processed_path != audio_path:
-                temp_file = processed_path
-
-            result = self.model.transcribe(processed_path, fp16=False)
+            with span('whisper.transcribe'):
+                result = self.model.transcribe(audio, fp16=False)
             return {
                 'text': result["text"].strip(),
                 'error': None
             }
 
         except Exception as e:
-            print(f"Error transcribing audio {audio_path}: {str(e)}")
+            print(f"Error transcribing audio {describe_source(audio_path)}: {str(e)}")
             return {
                 'text': '',
                 'error': str(e)
             }
-        finally:
-            # Clean up temporary file
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except Exception as e:
-                    print(f"Error cleaning up temporary file {temp_file}: {str(e)}")
\ No newline at end of file